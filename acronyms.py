@@ -0,0 +1,48 @@
+from collections import Counter
+
+from main_v2 import acronym_occurrences, filter_acronyms
+
+# An acronym used in at least this many paragraphs of a document is part of its vocabulary
+MIN_PARAGRAPHS = 2
+
+
+# ----------------------
+# Document level acronym index
+# ----------------------
+class DocumentAcronymIndex:
+    """
+    Acronyms of every language version of one document, counted per paragraph.
+    Acronyms of different languages often differ in one letter (EU / ES, ECB / EZB,
+    MFF / MFR); a pair where both words are used elsewhere in the document, or
+    appear in the other language as well, is a translation convention rather than
+    a typo. A typo is a one-off and stays reported.
+        index = DocumentAcronymIndex(document, ["en", "de", "lv"])
+        result = index.suppress(result, "en", "lv", paragraph_en, paragraph_lv)
+    document = {lang: [{"para": str, "para_number": int}, ...]}
+    """
+    def __init__(self, document, languages, min_paragraphs=MIN_PARAGRAPHS):
+        self.min_paragraphs = min_paragraphs
+        self.counts = {
+            lang: Counter(word for p in document[lang] for word in acronym_occurrences(p["para"]))
+            for lang in languages
+        }
+        self.suppressed = 0
+
+    def is_known(self, lang, word, other_lang):
+        return self.counts[lang][word] >= self.min_paragraphs or self.counts[other_lang][word] > 0
+
+    def is_convention(self, lang_a, lang_b, word_a, word_b):
+        return self.is_known(lang_a, word_a, lang_b) and self.is_known(lang_b, word_b, lang_a)
+
+    def suppress(self, result, lang_a, lang_b, paragraph_a, paragraph_b):
+        """
+        Returns result without the acronym pairs that are conventions of the document,
+        as a new dict; the numeric errors are kept as they are.
+        """
+        if not any(self.is_convention(lang_a, lang_b, w1, w2) for w1, w2 in result["acronyms"]):
+            return result
+        self.suppressed += 1
+        return filter_acronyms(
+            result, paragraph_a, paragraph_b,
+            keep=lambda w1, w2: not self.is_convention(lang_a, lang_b, w1, w2),
+        )
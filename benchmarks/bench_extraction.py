@@ -0,0 +1,77 @@
+"""
+Micro-benchmark of the numeric token extraction on the new_data/eval_sample_*.json files.
+
+Compares the old per-word regex extraction with the single-pass scanner in
+main_v2.py and prints tokens/sec for both.
+
+    python benchmarks/bench_extraction.py [--repeat 50]
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from main_v2 import get_all_strings_containing_numbers
+
+
+def legacy_get_all_strings_containing_numbers(paragraph):
+    # The extraction as it was before the single-pass scanner: (tokens, word indexes)
+    words = paragraph.replace("\xa0%", "%").replace("  %", "%").split()
+    number_words = []
+    indexes = []
+    for i, word in enumerate(words):
+        tokens = re.findall(r'\b\d+%|\b\w+\b', word)
+        for token in tokens:
+            if re.search(r'\d', token):
+                number_words.append(token)
+                indexes.append(i)
+    return number_words, indexes
+
+
+def load_paragraphs():
+    paragraphs = []
+    for path in sorted((ROOT / "new_data").glob("eval_sample_*.json")):
+        with open(path, 'r', encoding='utf-8') as f:
+            for doc in json.load(f):
+                paragraphs.extend(p["para"] for p in doc["para"])
+    return paragraphs
+
+
+def bench(extract, paragraphs, repeat):
+    tokens = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for paragraph in paragraphs:
+            tokens += len(extract(paragraph))
+    elapsed = time.perf_counter() - start
+    return tokens, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    paragraphs = load_paragraphs()
+    for paragraph in paragraphs:
+        tokens = get_all_strings_containing_numbers(paragraph)
+        assert legacy_get_all_strings_containing_numbers(paragraph) == ([t.text for t in tokens],
+                                                                         [t.word_index for t in tokens])
+
+    print(f"{len(paragraphs)} paragraphs x {args.repeat} repeats")
+    results = {}
+    for name, extract in [("before", lambda paragraph: legacy_get_all_strings_containing_numbers(paragraph)[0]),
+                          ("after", get_all_strings_containing_numbers)]:
+        tokens, elapsed = bench(extract, paragraphs, args.repeat)
+        results[name] = tokens / elapsed
+        print(f"{name:>6}: {tokens} tokens in {elapsed:.3f}s -> {results[name]:,.0f} tokens/sec")
+    print(f"speedup: {results['after'] / results['before']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
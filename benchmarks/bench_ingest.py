@@ -0,0 +1,90 @@
+"""
+Timing of reading the data/test_sample_*.docx files into the checker.
+
+    two-step: docx -> parsed json file -> load_documents (the json write and
+              re-read that the external converter flow needs)
+    direct:   load_documents on the .docx files, no intermediate file
+    json:     load_documents on the shipped *_parsed.json, for reference
+
+The variants are timed in turns (median of the repeats), then each is followed by a
+full check with ConsistencyEngine, to show the share of ingestion in the whole run.
+
+Measured on the three sample documents: 1.12-1.14x for direct vs two-step over
+six runs of --repeat 50 (about 23-27 ms against 26-31 ms). Timing the variants one after
+the other with the mean, as this script first did, swung between 0.85x and 1.1x.
+Parsing the xml dominates both; the direct read also writes no intermediate files.
+
+    python benchmarks/bench_ingest.py [--repeat 20]
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from docx_ingest import docx_to_json
+from engine import ConsistencyEngine, load_documents
+
+LANGS = ["en", "de", "lv"]
+
+
+def two_step(tmp_dir):
+    paths = {}
+    for lang in LANGS:
+        paths[lang] = Path(tmp_dir) / f"test_sample_{lang}_parsed.json"
+        docx_to_json([ROOT / "data" / f"test_sample_{lang}.docx"], paths[lang])
+    return load_documents(paths)
+
+
+def direct(_):
+    return load_documents({lang: ROOT / "data" / f"test_sample_{lang}.docx" for lang in LANGS})
+
+
+def parsed_json(_):
+    return load_documents({lang: ROOT / "data" / f"test_sample_{lang}_parsed.json" for lang in LANGS})
+
+
+VARIANTS = [("two-step", two_step), ("direct", direct), ("json", parsed_json)]
+
+
+def time_ingest(repeat, tmp_dir):
+    # The variants take turns in every repeat, so a slower stretch of the machine
+    # hits all of them; the median of the repeats is reported
+    times = {name: [] for name, _ in VARIANTS}
+    for _ in range(repeat):
+        for name, load in VARIANTS:
+            start = time.perf_counter()
+            load(tmp_dir)
+            times[name].append(time.perf_counter() - start)
+    return {name: statistics.median(t) for name, t in times.items()}
+
+
+def time_check(documents):
+    with ConsistencyEngine(LANGS) as engine:
+        start = time.perf_counter()
+        findings = engine.check_batch(documents)
+        check = time.perf_counter() - start
+    paragraphs = sum(len(doc["para"]["en"]) for doc in documents)
+    return paragraphs, sum(map(len, findings)), check
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ingest = time_ingest(args.repeat, tmp_dir)
+        for name, load in VARIANTS:
+            paragraphs, findings, check = time_check(load(tmp_dir))
+            print(f"{name:>8}: {paragraphs} paragraphs, {findings} findings, "
+                  f"ingest {ingest[name] * 1000:.1f} ms, check {check * 1000:.1f} ms")
+    print(f"direct vs two-step ingest: {ingest['two-step'] / ingest['direct']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Micro-benchmark of the align_numeric_tokens similarity matrix at paragraph sizes of
+hundreds of numeric tokens.
+
+Compares the per-cell numeric_similarity loop, the dense int32 incidence product
+it was first vectorized with, and build_similarity_matrix in main_v2.py, on two
+sides of distinct tokens (the worst case: nothing is taken out by the exact pass).
+
+    python benchmarks/bench_similarity.py [--sizes 100 300 500 1000] [--repeat 3]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from main_v2 import NumericToken, align_numeric_tokens, build_similarity_matrix, numeric_similarity
+
+
+def loop_similarity_matrix(seq1, seq2):
+    # The matrix as it was before vectorizing, one numeric_similarity per cell
+    sim = np.zeros((len(seq1), len(seq2)))
+    for i, a in enumerate(seq1):
+        for j, b in enumerate(seq2):
+            sim[i, j] = numeric_similarity(a, b)
+    return sim
+
+
+def incidence_similarity_matrix(seq1, seq2):
+    # The first vectorized version: dense int32 token x part incidence matrix, whose
+    # integer product doesn't go through BLAS and is cubic in the distinct tokens
+    vocab = {}
+    ids1 = np.array([vocab.setdefault(t, len(vocab)) for t in seq1], dtype=np.intp)
+    ids2 = np.array([vocab.setdefault(t, len(vocab)) for t in seq2], dtype=np.intp)
+    tokens = list(vocab)
+    parts = {}
+    rows, cols = [], []
+    for t_id, token in enumerate(tokens):
+        for part in set(token.split()):
+            rows.append(t_id)
+            cols.append(parts.setdefault(part, len(parts)))
+    incidence = np.zeros((len(tokens), len(parts)), dtype=np.int32)
+    incidence[rows, cols] = 1
+    inter = incidence @ incidence.T
+    sizes = incidence.sum(axis=1)
+    union = sizes[:, None] + sizes[None, :] - inter
+    unique_sim = np.divide(inter, union, out=np.zeros(inter.shape), where=union > 0)
+    np.fill_diagonal(unique_sim, 1.0)
+    return unique_sim[np.ix_(ids1, ids2)]
+
+
+def make_tokens(size, rng):
+    # Distinct amounts, years and references like the extractor returns them
+    tokens = set()
+    while len(tokens) < 2 * size:
+        tokens.add(rng.choice([str(rng.randint(1, 10 ** 6)), f"{rng.randint(1, 99)}%", f"20{rng.randint(10, 99)}"]))
+    tokens = list(tokens)
+    return tokens[:size], tokens[size:]
+
+
+def bench(fn, args, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 500, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for size in args.sizes:
+        seq1, seq2 = make_tokens(size, rng)
+        assert np.array_equal(build_similarity_matrix(seq1, seq2), loop_similarity_matrix(seq1, seq2))
+        times = {
+            "loop": bench(loop_similarity_matrix, (seq1, seq2), args.repeat),
+            "incidence": bench(incidence_similarity_matrix, (seq1, seq2), args.repeat),
+            "current": bench(build_similarity_matrix, (seq1, seq2), args.repeat),
+        }
+        tokens1 = [NumericToken(t, i) for i, t in enumerate(seq1)]
+        tokens2 = [NumericToken(t, i) for i, t in enumerate(seq2)]
+        align = bench(align_numeric_tokens, (tokens1, tokens2), args.repeat)
+        print(f"{size:>5} tokens per side: " + "  ".join(f"{name} {t:.4f}s" for name, t in times.items())
+              + f"  -> {times['loop'] / times['current']:.1f}x the loop,"
+                f" {times['incidence'] / times['current']:.1f}x the incidence product;"
+                f" align_numeric_tokens {align:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Benchmark suite over the synthetic corpus of benchmarks/synthetic.py.
+
+Stages, timed per call on every paragraph (or en/other paragraph pair):
+    extraction    get_all_strings_containing_numbers
+    normalized    normalization.canonical_numbers
+    align         align_numeric_tokens on the extracted tokens of a pair
+    acronyms      levenstein_distance of a pair
+    currency      scratch_files.currency.count_currencies
+    engine        ConsistencyEngine, timed per paragraph tuple (check_paragraphs) with
+                  --workers 1, per document (check_document) with more workers
+
+For every scale: calls, items/sec, latency p50/p90/p99 and the peak traced memory
+of a single call (tracemalloc, measured in a separate run so it doesn't slow the
+timings; results are dropped, so the peak is the working set of the call and not
+the accumulated output).
+
+    python benchmarks/bench_suite.py --scales 1 10 100 --out bench.json
+    python benchmarks/bench_suite.py --scales 1 10 --baseline bench.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import LANGS, generate
+from engine import ConsistencyEngine
+from main_v2 import align_numeric_tokens, get_all_strings_containing_numbers, levenstein_distance
+from normalization import canonical_numbers
+from scratch_files.currency import count_currencies
+
+# A stage is slower than its baseline when its throughput dropped by more than this
+REGRESSION_THRESHOLD = 0.10
+
+
+# ----------------------
+# Stages
+# ----------------------
+def paragraph_calls(corpus):
+    for lang in LANGS:
+        for doc in corpus[lang]:
+            for p in doc["para"]:
+                yield lang, p["para"]
+
+
+def pair_calls(corpus):
+    for lang in LANGS[1:]:
+        for doc_a, doc_b in zip(corpus[LANGS[0]], corpus[lang]):
+            for p_a, p_b in zip(doc_a["para"], doc_b["para"]):
+                yield p_a["para"], p_b["para"]
+
+
+def stage_calls(corpus):
+    """{stage: (list of argument tuples, function)}"""
+    paragraphs = list(paragraph_calls(corpus))
+    pairs = list(pair_calls(corpus))
+    extracted = [(get_all_strings_containing_numbers(a), get_all_strings_containing_numbers(b)) for a, b in pairs]
+    return {
+        "extraction": ([(p,) for _, p in paragraphs], get_all_strings_containing_numbers),
+        "normalized": (paragraphs, lambda lang, p: canonical_numbers(p, lang)),
+        "align": (extracted, align_numeric_tokens),
+        "acronyms": (pairs, levenstein_distance),
+        "currency": ([(p,) for _, p in paragraphs], count_currencies),
+    }
+
+
+def time_calls(calls, fn):
+    latencies = np.empty(len(calls))
+    clock = time.perf_counter
+    for i, args in enumerate(calls):
+        start = clock()
+        fn(*args)
+        latencies[i] = clock() - start
+    return latencies
+
+
+def peak_memory(calls, fn):
+    # Largest allocation peak of one call above what was allocated before it
+    peak = 0
+    tracemalloc.start()
+    try:
+        for args in calls:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            fn(*args)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+        return peak
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(stage, scale, items, latencies, peak):
+    total = float(latencies.sum())
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1e6 if len(latencies) else (0.0, 0.0, 0.0)
+    return {
+        "stage": stage,
+        "scale": scale,
+        "calls": int(len(latencies)),
+        "items": items,
+        "seconds": total,
+        "items_per_sec": items / total if total else 0.0,
+        "p50_us": float(p50),
+        "p90_us": float(p90),
+        "p99_us": float(p99),
+        "peak_mb": peak / 2 ** 20,
+    }
+
+
+def run_scale(scale, seed, engine_workers):
+    corpus, errors = generate(scale, seed=seed)
+    results = []
+    for stage, (calls, fn) in stage_calls(corpus).items():
+        latencies = time_calls(calls, fn)
+        results.append(summarize(stage, scale, len(calls), latencies, peak_memory(calls, fn)))
+
+    documents = [
+        {"file": docs[0]["file"], "para": {lang: doc["para"] for lang, doc in zip(LANGS, docs)}}
+        for docs in zip(*(corpus[lang] for lang in LANGS))
+    ]
+    paragraphs = sum(len(doc["para"][LANGS[0]]) for doc in documents)
+
+    with ConsistencyEngine(LANGS, workers=engine_workers) as engine:
+        if engine_workers > 1:
+            # A single paragraph tuple would only time the hand-off to the workers
+            calls = [(doc["para"], doc["file"]) for doc in documents]
+            check = engine.check_document
+        else:
+            calls = [
+                (paragraphs_row, par_num, doc["file"])
+                for doc in documents
+                for par_num, paragraphs_row in enumerate(engine.paragraph_rows(doc["para"], doc["file"]))
+            ]
+            check = engine.check_paragraphs
+        findings = []
+        clock = time.perf_counter
+        latencies = np.empty(len(calls))
+        for i, args in enumerate(calls):
+            start = clock()
+            findings.extend(check(*args))
+            latencies[i] = clock() - start
+        peak = peak_memory(calls, check)
+    result = summarize("engine", scale, paragraphs, latencies, peak)
+    result["findings"] = len(findings)
+    result["injected_errors"] = len(errors)
+    results.append(result)
+    return results
+
+
+# ----------------------
+# Output
+# ----------------------
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "commit": commit or None,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results, baseline):
+    """Throughput ratio against a previous run, per (stage, scale) present in both."""
+    before = {(r["stage"], r["scale"]): r for r in baseline["results"]}
+    rows = []
+    for r in results:
+        old = before.get((r["stage"], r["scale"]))
+        if old and old["items_per_sec"]:
+            ratio = r["items_per_sec"] / old["items_per_sec"]
+            rows.append({"stage": r["stage"], "scale": r["scale"], "ratio": ratio,
+                         "regression": ratio < 1 - REGRESSION_THRESHOLD})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for the engine stage")
+    parser.add_argument("--out", help="Write the results as json to this file")
+    parser.add_argument("--baseline", help="Previous --out file to compare the throughput with")
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        for r in run_scale(scale, args.seed, args.workers):
+            results.append(r)
+            print(f"{r['scale']:>4}x {r['stage']:>10}: {r['items']:>7} items {r['items_per_sec']:>12,.0f}/s "
+                  f"p50 {r['p50_us']:>9.1f}us p99 {r['p99_us']:>9.1f}us peak {r['peak_mb'] * 1024:>9.1f} KB",
+                  file=sys.stderr)
+
+    report = {"meta": metadata(), "results": results}
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            report["comparison"] = compare(results, json.load(f))
+        for row in report["comparison"]:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['scale']:>4}x {row['stage']:>10}: {row['ratio']:.2f}x baseline{flag}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Synthetic multilingual corpus built from the new_data/eval_sample_{en,de,lv}.json paragraphs.
+
+Every copy of the sample is a new document: the numbers of a copy are remapped
+consistently in all languages (so copies differ but stay correct translations),
+then errors are injected into single languages at a controlled rate:
+
+    number    one digit of a numeric token changed
+    date      a year changed
+    currency  a currency code swapped for another one
+    acronym   one letter of an upper case word changed (Levenshtein distance 1)
+
+    python benchmarks/synthetic.py --scale 10 --out-dir /tmp/synthetic
+writes synthetic_{lang}.json in the parsed format plus synthetic_errors.json with
+the injected errors.
+"""
+import argparse
+import json
+import random
+import re
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+LANGS = ["en", "de", "lv"]
+KINDS = ("number", "date", "currency", "acronym")
+
+NUMBER_RE = re.compile(r"\b\d+\b")
+YEAR_RE = re.compile(r"\b(19|20)\d\d\b")
+CURRENCY_RE = re.compile(r"\b(EUR|USD|GBP|CHF|MDL)\b")
+ACRONYM_RE = re.compile(r"\b[A-Z]{2,6}\b")
+CURRENCIES = ["EUR", "USD", "GBP", "CHF", "MDL"]
+
+
+def load_sample(langs=LANGS):
+    sample = {}
+    for lang in langs:
+        with open(ROOT / "new_data" / f"eval_sample_{lang}.json", 'r', encoding='utf-8') as f:
+            sample[lang] = [p for doc in json.load(f) for p in doc["para"]]
+    return sample
+
+
+# ----------------------
+# Mutations
+# ----------------------
+def remap_numbers(texts, rng):
+    """
+    Replace the numbers of 3+ digits that appear as such in every language by another
+    number of the same length, the same way in all languages. Numbers written
+    differently per language ("779,902.87" / "779902,87") are left alone.
+    """
+    shared = set.intersection(*(set(NUMBER_RE.findall(text)) for text in texts.values()))
+    mapping = {}
+
+    def repl(match):
+        number = match.group()
+        if len(number) < 3 or number not in shared or YEAR_RE.fullmatch(number):
+            return number
+        if number not in mapping:
+            mapping[number] = str(rng.randint(10 ** (len(number) - 1), 10 ** len(number) - 1))
+        return mapping[number]
+
+    return {lang: NUMBER_RE.sub(repl, text) for lang, text in texts.items()}
+
+
+def _replace_one(pattern, text, rng, change):
+    matches = list(pattern.finditer(text))
+    if not matches:
+        return None
+    match = rng.choice(matches)
+    before = match.group()
+    after = change(before)
+    if after == before:
+        return None
+    return text[:match.start()] + after + text[match.end():], before, after
+
+
+def inject(kind, text, rng):
+    """Returns (mutated text, before, after) or None when the paragraph has nothing of that kind."""
+    if kind == "number":
+        def change(number):
+            i = rng.randrange(len(number))
+            digit = rng.choice([d for d in "0123456789" if d != number[i]])
+            return number[:i] + digit + number[i + 1:]
+        return _replace_one(NUMBER_RE, text, rng, change)
+    if kind == "date":
+        return _replace_one(YEAR_RE, text, rng, lambda year: str(int(year) + rng.choice([-1, 1])))
+    if kind == "currency":
+        return _replace_one(CURRENCY_RE, text, rng, lambda code: rng.choice([c for c in CURRENCIES if c != code]))
+    if kind == "acronym":
+        def change(word):
+            i = rng.randrange(len(word))
+            return word[:i] + rng.choice([c for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ" if c != word[i]]) + word[i + 1:]
+        return _replace_one(ACRONYM_RE, text, rng, change)
+    raise ValueError(f"Unknown error kind {kind!r}")
+
+
+# ----------------------
+# Corpus
+# ----------------------
+def generate(scale=1, error_rate=0.05, seed=0, langs=LANGS, kinds=KINDS):
+    """
+    Returns ({lang: [documents in the parsed json format]}, [injected errors]).
+    scale = number of copies of the sample, every copy is one document.
+    error_rate = probability that a paragraph gets an error in one non-reference language.
+    """
+    rng = random.Random(seed)
+    sample = load_sample(langs)
+    corpus = {lang: [] for lang in langs}
+    errors = []
+    for copy in range(scale):
+        name = f"synthetic_{copy:05d}.docx"
+        paragraphs = {lang: [] for lang in langs}
+        for par_num, row in enumerate(zip(*(sample[lang] for lang in langs))):
+            texts = {lang: p["para"] for lang, p in zip(langs, row)}
+            if copy:
+                texts = remap_numbers(texts, rng)
+            if rng.random() < error_rate:
+                lang = rng.choice(langs[1:])
+                for kind in rng.sample(kinds, len(kinds)):
+                    mutated = inject(kind, texts[lang], rng)
+                    if mutated:
+                        texts[lang], before, after = mutated
+                        errors.append({"file": name, "par_num": par_num, "lang": lang,
+                                       "kind": kind, "before": before, "after": after})
+                        break
+            for lang, p in zip(langs, row):
+                paragraphs[lang].append({"para": texts[lang], "para_number": p["para_number"]})
+        for lang in langs:
+            corpus[lang].append({"file": name, "para": paragraphs[lang]})
+    return corpus, errors
+
+
+def write(corpus, errors, out_dir):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for lang, documents in corpus.items():
+        paths[lang] = out_dir / f"synthetic_{lang}.json"
+        with open(paths[lang], 'w', encoding='utf-8') as f:
+            json.dump(documents, f, ensure_ascii=False)
+    with open(out_dir / "synthetic_errors.json", 'w', encoding='utf-8') as f:
+        json.dump(errors, f, ensure_ascii=False, indent=1)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out-dir", required=True)
+    args = parser.parse_args()
+
+    corpus, errors = generate(args.scale, args.error_rate, args.seed)
+    paths = write(corpus, errors, args.out_dir)
+    print(f"{args.scale} documents, {len(errors)} injected errors -> {', '.join(map(str, paths.values()))}")
+
+
+if __name__ == "__main__":
+    main()
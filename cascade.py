@@ -0,0 +1,197 @@
+import argparse
+import json
+import sys
+from collections import defaultdict
+
+import metrics
+from engine import ConsistencyEngine, load_documents, parse_lang_paths
+from result_cache import ResultCache
+
+TIERS = ("deterministic", "similarity", "llm")
+
+
+class CascadeStats:
+    """Per tier: paragraphs seen, resolved at that tier and escalated to the next one."""
+    def __init__(self):
+        self.seen = defaultdict(int)
+        self.resolved = defaultdict(int)
+        self.escalated = defaultdict(int)
+
+    def as_dict(self):
+        out = {}
+        for tier in TIERS:
+            seen = self.seen[tier]
+            out[tier] = {
+                "seen": seen,
+                "resolved": self.resolved[tier],
+                "escalated": self.escalated[tier],
+                "escalation_rate": self.escalated[tier] / seen if seen else 0.0,
+            }
+        total = self.seen["deterministic"]
+        out["llm_calls_avoided"] = total - self.seen["llm"]
+        return out
+
+
+class Cascade:
+    """
+    Cheap-first checking of aligned paragraphs:
+      1. deterministic: ConsistencyEngine (extraction, normalization, alignment).
+         Paragraphs without findings are clean and stop here.
+      2. similarity: cross-language similarity of the suspicious paragraphs,
+         similarity(list of {lang: text}) -> list of floats. A finding on a well
+         aligned paragraph (similarity >= similarity_threshold and alignment
+         score >= min_score) is reported as is, the rest is low confidence.
+      3. llm: LLMStage (scratch_files/llm_stage.py) judges the low confidence
+         paragraphs; its "no error" answer dismisses the deterministic finding.
+         With a cache on the stage, verdicts of earlier runs are not asked again.
+    Missing tiers are skipped: without similarity every finding goes to the LLM,
+    without an LLM low confidence findings are reported unverified.
+    """
+    def __init__(self, engine, similarity=None, llm_stage=None, similarity_threshold=0.9, min_score=0.5):
+        self.engine = engine
+        self.similarity = similarity
+        self.llm_stage = llm_stage
+        self.similarity_threshold = similarity_threshold
+        self.min_score = min_score
+        self.stats = CascadeStats()
+
+    def run(self, document, name=None):
+        """
+        document = {lang: [{"para": str, "para_number": int}, ...]}
+        Returns one record per paragraph reported as an error:
+        {"file", "par_num", "para_number", "decided_by", "findings", "similarity", "llm"}
+        """
+        languages = self.engine.languages
+        rows = self.engine.paragraph_rows(document, name)
+
+        # Tier 1
+        by_par = defaultdict(list)
+        for finding in self.engine.check_document(document, name, rows=rows):
+            by_par[finding["par_num"]].append(finding)
+        self.stats.seen["deterministic"] += len(rows)
+        self.stats.resolved["deterministic"] += len(rows) - len(by_par)
+        self.stats.escalated["deterministic"] += len(by_par)
+
+        records = {
+            par_num: {
+                "file": name,
+                "par_num": par_num,
+                "para_number": rows[par_num][self.engine.reference].get("para_number"),
+                "decided_by": "deterministic",
+                "findings": findings,
+                "similarity": None,
+                "llm": None,
+            }
+            for par_num, findings in sorted(by_par.items())
+        }
+
+        # Tier 2
+        low_confidence = list(records)
+        if self.similarity is not None and records:
+            self.stats.seen["similarity"] += len(records)
+            texts = [{lang: rows[par_num][lang]["para"] for lang in languages} for par_num in records]
+            low_confidence = []
+            for par_num, sim in zip(list(records), self.similarity(texts)):
+                record = records[par_num]
+                record["similarity"] = float(sim)
+                score = min(f["score"] for f in record["findings"])
+                if sim >= self.similarity_threshold and score >= self.min_score:
+                    record["decided_by"] = "similarity"
+                    self.stats.resolved["similarity"] += 1
+                else:
+                    low_confidence.append(par_num)
+                    self.stats.escalated["similarity"] += 1
+
+        # Tier 3
+        if self.llm_stage is not None and low_confidence:
+            self.stats.seen["llm"] += len(low_confidence)
+            items = [(par_num, tuple(rows[par_num][lang]["para"] for lang in languages)) for par_num in low_confidence]
+            for par_num, answer in self.llm_stage.run(items).items():
+                record = records[par_num]
+                record["llm"] = answer
+                if answer["flag"] is None:
+                    record["decided_by"] = "unverified"
+                    continue
+                self.stats.resolved["llm"] += 1
+                record["decided_by"] = "llm"
+                if not answer["flag"]:
+                    del records[par_num]
+        else:
+            for par_num in low_confidence:
+                records[par_num]["decided_by"] = "unverified"
+
+        return list(records.values())
+
+    def run_batch(self, documents):
+        # A list in input order, so documents with the same (or no) file name are kept apart
+        return [{"file": doc["file"], "findings": self.run(doc["para"], name=doc["file"])} for doc in documents]
+
+
+# ----------------------
+# CLI
+# ----------------------
+def make_llm_stage(kind, concurrency, rate, batch_size, token_budget=None, cache=None):
+    # Imported here, the model clients are heavy and need credentials
+    from scratch_files.llm_stage import FakeModel, GeminiModel, LLMStage, WatsonxModel
+    if kind == "watsonx":
+        from scratch_files.reading_json import parameters, setup_watsnox
+        model = WatsonxModel(setup_watsnox(), parameters)
+    elif kind == "gemini":
+        from scratch_files.gemini import Gemini
+        model = GeminiModel(Gemini())
+    else:
+        model = FakeModel(answer=lambda prompt: "1:unchecked")
+    return LLMStage(model, concurrency=concurrency, rate=rate, batch_size=batch_size, token_budget=token_budget,
+                    cache=cache)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cheap-first consistency check: deterministic, similarity, LLM.")
+    parser.add_argument("inputs", nargs="+", help="LANG=PATH to a parsed json file, the first one is the reference")
+    parser.add_argument("--similarity", action="store_true", help="Enable the sentence embedding tier")
+    parser.add_argument("--embedding-store", help="Directory to persist paragraph embeddings in")
+    parser.add_argument("--similarity-threshold", type=float, default=0.9)
+    parser.add_argument("--llm", choices=("none", "fake", "watsonx", "gemini"), default="none")
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--llm-rate", type=float, default=None, help="Max LLM requests per second")
+    parser.add_argument("--llm-batch", type=int, default=1, help="Paragraph tuples per prompt")
+    parser.add_argument("--llm-tokens", type=int, default=None,
+                        help="Pack the paragraph tuples into prompts of up to this many tokens")
+    parser.add_argument("--suppression", help="JSON file of recurring acronym pairs to learn from and not escalate")
+    parser.add_argument("--cache", help="SQLite file to cache paragraph results and LLM verdicts in")
+    parser.add_argument("--cache-max-mb", type=int, default=512, help="Evict old cache entries above this size")
+    parser.add_argument("--out", help="Write the records to this json file instead of stdout")
+    parser.add_argument("--metrics", help="Write stage timings, counters and LLM tokens to this file (.prom or .json)")
+    args = parser.parse_args(argv)
+
+    metrics.enable(bool(args.metrics))
+    paths = parse_lang_paths(args.inputs)
+    cache = ResultCache(args.cache, max_bytes=args.cache_max_mb * 1024 * 1024) if args.cache else None
+    llm_stage = None
+    if args.llm != "none":
+        llm_stage = make_llm_stage(args.llm, args.llm_concurrency, args.llm_rate, args.llm_batch, args.llm_tokens,
+                                   cache=cache)
+    similarity = None
+    if args.similarity:
+        from embeddings import EmbeddingService
+        similarity = EmbeddingService(store_dir=args.embedding_store)
+    with ConsistencyEngine(paths, suppression=args.suppression, cache=cache) as engine:
+        cascade = Cascade(engine, similarity=similarity, llm_stage=llm_stage,
+                          similarity_threshold=args.similarity_threshold)
+        results = cascade.run_batch(load_documents(paths))
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    print(f"tiers: {json.dumps(cascade.stats.as_dict())}", file=sys.stderr)
+    if llm_stage is not None:
+        print(f"llm: {json.dumps(llm_stage.stats())}", file=sys.stderr)
+    if args.metrics:
+        metrics.write(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+from collections import Counter
+
+from main_v2 import (
+    add_acronym_mismatches,
+    clean_token,
+    findings_result,
+    get_all_strings_containing_numbers,
+    numeric_mismatches,
+)
+
+
+# ----------------------
+# Canonical numeric facts
+# ----------------------
+def raw_numbers(paragraph, lang):
+    return get_all_strings_containing_numbers(paragraph)
+
+
+def numeric_facts(paragraph, lang, extract=raw_numbers):
+    """
+    Extract the numeric tokens of one paragraph once with extract(paragraph, lang).
+    Returns ([NumericToken], canonical) where canonical is an order independent
+    multiset of the normalized tokens, comparable across languages.
+    """
+    tokens = extract(paragraph, lang)
+    canonical = frozenset(Counter(clean_token(t.text) for t in tokens).items())
+    return tokens, canonical
+
+
+def find_consensus(canonical_by_lang):
+    """
+    canonical_by_lang = {lang: canonical multiset}, the reference language first
+    The consensus is the multiset shared by the most languages, ties go to the
+    language that comes first. The pivot is the first language holding it.
+    Returns (pivot, divergent languages).
+    """
+    votes = Counter(canonical_by_lang.values())
+    consensus, _ = votes.most_common(1)[0]
+    pivot = next(lang for lang, canonical in canonical_by_lang.items() if canonical == consensus)
+    divergent = [lang for lang, canonical in canonical_by_lang.items() if canonical != consensus]
+    return pivot, divergent
+
+
+# ----------------------
+# Paragraph check
+# ----------------------
+def check_paragraphs_consensus(paragraphs, languages, acronyms=True, extract=raw_numbers):
+    """
+    paragraphs = {lang: paragraph text}
+    extract(paragraph, lang) returns [NumericToken], by default the raw tokens.
+    Every language is extracted once and compared to the consensus; only the
+    divergent languages are aligned against the pivot with align_numeric_tokens, so a
+    paragraph costs at most N - 1 alignments instead of N * (N - 1) / 2.
+    The acronym check runs for every language against the pivot.
+    Returns (pivot, [(lang, result)]) with one result per language other than the pivot.
+    """
+    facts = {lang: numeric_facts(paragraphs[lang], lang, extract) for lang in languages}
+    pivot, divergent = find_consensus({lang: facts[lang][1] for lang in languages})
+    numbers_pivot = facts[pivot][0]
+
+    results = []
+    for lang in languages:
+        if lang == pivot:
+            continue
+        if lang in divergent:
+            result = numeric_mismatches(numbers_pivot, facts[lang][0])
+        else:
+            result = findings_result([], 1.0)
+        if acronyms:
+            add_acronym_mismatches(result, paragraphs[pivot], paragraphs[lang])
+        results.append((lang, result))
+    return pivot, results
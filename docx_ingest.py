@@ -0,0 +1,114 @@
+import json
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+# Footnotes that only hold the separator line above the notes
+SEPARATOR_TYPES = {"separator", "continuationSeparator", "continuationNotice"}
+
+
+# ----------------------
+# OOXML parsing
+# ----------------------
+def _iter_part(z, part, item_tag=None):
+    """
+    Streams one xml part of the docx and yields the text of every paragraph.
+    Table rows come out as one "| cell | cell |" paragraph. With item_tag
+    (w:footnote) all paragraphs of one item are joined into one text.
+    Elements are cleared once read, so memory does not grow with the document.
+    """
+    runs = []        # text pieces of the current paragraph
+    cells, row = [], []
+    item = []
+    table_depth = 0
+    skip = False
+    with z.open(part) as f:
+        for event, el in ET.iterparse(f, events=("start", "end")):
+            tag = el.tag
+            if event == "start":
+                if tag == W + "tbl":
+                    table_depth += 1
+                elif item_tag and tag == item_tag:
+                    skip = el.get(W + "type") in SEPARATOR_TYPES
+                continue
+
+            if tag == W + "t":
+                runs.append(el.text or "")
+            elif tag == W + "tab":
+                runs.append("\t")
+            elif tag in (W + "br", W + "cr"):
+                runs.append("\n")
+            elif tag == W + "noBreakHyphen":
+                runs.append("-")
+            elif tag == W + "p":
+                text = "".join(runs).strip()
+                runs = []
+                if table_depth:
+                    if text:
+                        cells.append(text)
+                elif item_tag:
+                    if text:
+                        item.append(text)
+                elif text:
+                    yield text
+                el.clear()
+            elif tag == W + "tc":
+                row.append(" ".join(cells))
+                cells = []
+            elif tag == W + "tr":
+                if any(row):
+                    text = "| " + " | ".join(row) + " |"
+                    if item_tag:
+                        item.append(text)
+                    else:
+                        yield text
+                row = []
+                el.clear()
+            elif tag == W + "tbl":
+                table_depth -= 1
+                el.clear()
+            elif item_tag and tag == item_tag:
+                if item and not skip:
+                    yield " ".join(item)
+                item = []
+                el.clear()
+
+
+def iter_docx_paragraphs(path, footnotes=True):
+    """
+    Yields {"para": str, "para_number": int} for every non-empty paragraph of a
+    .docx, read straight from word/document.xml, followed by one paragraph per
+    footnote, in the format of the parsed json files.
+    """
+    number = 0
+    with zipfile.ZipFile(path) as z:
+        parts = [("word/document.xml", None)]
+        if footnotes and "word/footnotes.xml" in z.namelist():
+            parts.append(("word/footnotes.xml", W + "footnote"))
+        for part, item_tag in parts:
+            for text in _iter_part(z, part, item_tag):
+                number += 1
+                yield {"para": text + "\n", "para_number": number}
+
+
+def load_docx_document(path, footnotes=True):
+    """One document in the parsed json format: {"file": name, "para": [...]}."""
+    return {"file": Path(path).name, "para": list(iter_docx_paragraphs(path, footnotes))}
+
+
+def docx_to_json(docx_paths, out_path, footnotes=True):
+    """Writes the parsed json file for one or more .docx files of the same language."""
+    documents = [load_docx_document(path, footnotes) for path in docx_paths]
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump(documents, f, ensure_ascii=False, indent=2)
+    return documents
+
+
+if __name__ == "__main__":
+    import sys
+
+    for path in sys.argv[1:]:
+        document = load_docx_document(path)
+        print(f"{document['file']}: {len(document['para'])} paragraphs")
@@ -0,0 +1,199 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+import metrics
+from result_cache import content_key
+
+MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
+
+# One loaded model per process and model name
+_MODELS = {}
+
+
+def load_model(name=MODEL_NAME, device="cpu"):
+    if (name, device) not in _MODELS:
+        # Imported here, sentence_transformers pulls in torch
+        from sentence_transformers import SentenceTransformer
+        with metrics.timer("model_load"):
+            _MODELS[name, device] = SentenceTransformer(name, device=device)
+    return _MODELS[name, device]
+
+
+# ----------------------
+# Vector store
+# ----------------------
+class VectorStore:
+    """
+    Embeddings on disk, keyed by content hash:
+      meta.json    {"model", "dim"}
+      keys.txt     one hash per line, line i is row i
+      vectors.f32  float32 rows, read back as a memory-mapped (rows, dim) array
+    New vectors are appended, existing rows are never rewritten.
+    """
+    def __init__(self, path, model_name, dim):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        meta_file = self.path / "meta.json"
+        meta = {"model": model_name, "dim": dim}
+        if meta_file.exists():
+            stored = json.loads(meta_file.read_text())
+            if stored != meta:
+                raise ValueError(f"Vector store {self.path} holds {stored}, expected {meta}")
+        else:
+            meta_file.write_text(json.dumps(meta))
+        self.keys_file = self.path / "keys.txt"
+        self.vectors_file = self.path / "vectors.f32"
+        self.keys_file.touch()
+        self.vectors_file.touch()
+
+        # A row only counts when both its key and its vector made it to disk
+        keys = self.keys_file.read_text().split()
+        rows = min(len(keys), self.vectors_file.stat().st_size // (4 * dim))
+        self.index = {key: row for row, key in enumerate(keys[:rows])}
+        self._vectors = None
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def vectors(self):
+        if self._vectors is None or len(self._vectors) < len(self.index):
+            if not self.index:
+                return np.empty((0, self.dim), dtype=np.float32)
+            self._vectors = np.memmap(self.vectors_file, dtype=np.float32, mode="r", shape=(len(self.index), self.dim))
+        return self._vectors
+
+    def lookup(self, keys):
+        """Returns (rows of the known keys, positions of the unknown keys)."""
+        rows, missing = [], []
+        for i, key in enumerate(keys):
+            row = self.index.get(key)
+            if row is None:
+                missing.append(i)
+            else:
+                rows.append((i, row))
+        return rows, missing
+
+    def add(self, keys, vectors):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with open(self.vectors_file, "ab") as f:
+            f.write(vectors.tobytes())
+        with open(self.keys_file, "a") as f:
+            f.write("".join(key + "\n" for key in keys))
+        for key in keys:
+            self.index[key] = len(self.index)
+
+
+# ----------------------
+# Service
+# ----------------------
+class EmbeddingService:
+    """
+    Sentence embeddings for paragraphs: the model is loaded once, only texts that
+    are not in the store yet are encoded, in batches of batch_size, and all
+    vectors are L2 normalized so a cosine similarity is a dot product.
+    Without store_dir the vectors are kept in memory for the lifetime of the service.
+    Can be passed directly as the similarity tier of cascade.Cascade.
+    """
+    def __init__(self, model_name=MODEL_NAME, store_dir=None, batch_size=128, device="cpu", model=None):
+        self.model_name = model_name
+        self.store_dir = store_dir
+        self.batch_size = batch_size
+        self.device = device
+        self._model = model
+        self._store = None
+        self.encoded = 0
+        self.reused = 0
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = load_model(self.model_name, self.device)
+        return self._model
+
+    @property
+    def store(self):
+        if self._store is None:
+            dim = self.model.get_sentence_embedding_dimension()
+            if self.store_dir is None:
+                self._store = MemoryStore(dim)
+            else:
+                self._store = VectorStore(self.store_dir, self.model_name, dim)
+        return self._store
+
+    def embed(self, texts):
+        """
+        texts = [str, ...]
+        Returns a (len(texts), dim) float32 array of normalized embeddings.
+        """
+        keys = [content_key(self.model_name, text) for text in texts]
+        store = self.store
+        out = np.empty((len(texts), store.dim), dtype=np.float32)
+        rows, missing = store.lookup(keys)
+        if rows:
+            positions, stored = zip(*rows)
+            out[list(positions)] = store.vectors[list(stored)]
+        self.reused += len(rows)
+
+        # Encode every distinct new text once
+        new = {}
+        for i in missing:
+            new.setdefault(keys[i], texts[i])
+        if new:
+            vectors = self.model.encode(list(new.values()), batch_size=self.batch_size,
+                                        convert_to_numpy=True, normalize_embeddings=True)
+            store.add(list(new), vectors)
+            self.encoded += len(new)
+            by_key = dict(zip(new, vectors))
+            for i in missing:
+                out[i] = by_key[keys[i]]
+        return out
+
+    def cross_language_similarity(self, rows, languages=None):
+        """
+        rows = [{lang: paragraph text}, ...], all with the same languages
+        Returns a (len(rows), len(languages)) array with the cosine similarity of
+        every language to the first one (the first column is 1).
+        """
+        if not rows:
+            return np.empty((0, len(languages or ())), dtype=np.float32)
+        languages = list(languages or rows[0])
+        vectors = self.embed([row[lang] for row in rows for lang in languages])
+        vectors = vectors.reshape(len(rows), len(languages), -1)
+        return np.einsum("rld,rd->rl", vectors, vectors[:, 0])
+
+    def document_similarity(self, document, languages):
+        """
+        document = {lang: [{"para": str, "para_number": int}, ...]}
+        Cross-language similarity of every aligned paragraph, see cross_language_similarity.
+        """
+        rows = [{lang: p["para"] for lang, p in zip(languages, row)}
+                for row in zip(*[document[lang] for lang in languages])]
+        return self.cross_language_similarity(rows, languages)
+
+    def __call__(self, rows):
+        # Cascade tier: the weakest language decides
+        return self.cross_language_similarity(rows).min(axis=1).tolist()
+
+    def stats(self):
+        return {"encoded": self.encoded, "reused": self.reused, "stored": len(self.store)}
+
+
+class MemoryStore(VectorStore):
+    """Same interface as VectorStore, without persistence."""
+    def __init__(self, dim):
+        self.dim = dim
+        self.index = {}
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+
+    @property
+    def vectors(self):
+        return self._vectors
+
+    def add(self, keys, vectors):
+        for key in keys:
+            self.index[key] = len(self.index)
+        self._vectors = np.concatenate([self._vectors, np.asarray(vectors, dtype=np.float32)])
@@ -0,0 +1,459 @@
+import argparse
+import json
+import logging
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from pathlib import Path
+
+from acronyms import DocumentAcronymIndex
+from consensus import check_paragraphs_consensus, raw_numbers
+from docx_ingest import load_docx_document
+import metrics
+from main_v2 import check_paragraph_pair, highlight_words
+from normalization import canonical_numbers, is_supported
+from paragraph_align import align_document
+from report import ReportWriter
+from result_cache import ResultCache, content_key
+from streaming import iter_aligned
+from suppression import SuppressionList
+
+log = logging.getLogger(__name__)
+
+MODES = ("reference", "consensus")
+
+# Part of every cache key: bump it whenever the checks change so old results are not reused
+CHECKER_VERSION = "3"
+
+
+# ----------------------
+# Document loading
+# ----------------------
+def load_documents(paths):
+    """
+    paths = {lang: json_file}, every file is a list of documents
+    [{"file": ..., "para": [{"para_number": int, "para": str}, ...]}, ...]
+    or a .docx file, which is read directly as one document.
+    Documents are paired by position across the files.
+    Returns a list of {"file": ..., "para": {lang: [paragraphs]}}.
+    """
+    data = {}
+    for lang, path in paths.items():
+        if str(path).endswith(".docx"):
+            data[lang] = [load_docx_document(path)]
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            data[lang] = json.load(f)
+
+    documents = []
+    for docs in zip(*data.values()):
+        documents.append({
+            "file": docs[0].get("file"),
+            "para": {lang: doc.get("para", []) for lang, doc in zip(data, docs)},
+        })
+    return documents
+
+
+# ----------------------
+# Engine
+# ----------------------
+def _measured(fn, task):
+    # Runs on a worker: its metrics go back with the result and are merged in the parent
+    metrics.enable()
+    metrics.REGISTRY.reset()
+    return fn(task), metrics.REGISTRY.snapshot()
+
+
+def _merge_metrics(results):
+    for result, snapshot in results:
+        metrics.REGISTRY.merge(snapshot)
+        yield result
+
+
+class ConsistencyEngine:
+    """
+    Numeric and acronym consistency checker for documents in several languages.
+    Build it once and reuse it for as many documents as needed; the first
+    language is the reference every other language is compared against.
+
+    With workers > 1 the paragraphs of all documents are sharded over a process
+    pool in chunks of chunk_size; findings come back in the input order.
+    workers=0 uses one worker per CPU.
+
+    mode="consensus" extracts every language once and only aligns the languages
+    whose numbers differ from the majority against a pivot language, which keeps
+    the work linear in the number of languages (see consensus.py).
+
+    align=True pairs the paragraphs with the document level aligner in
+    paragraph_align.py instead of by position, so one split or merged paragraph
+    doesn't shift every following pair.
+
+    acronym_index=True builds an acronyms.DocumentAcronymIndex of every document and drops
+    acronym pairs both languages use throughout the document (EU / ES), which are
+    translations rather than typos.
+
+    suppression = SuppressionList (or a path to one) records the mismatch pairs of
+    every finding and filters out the pairs that were found in several documents
+    of earlier runs before they are highlighted or reported; the table is saved on close().
+
+    With normalize=True numbers, percentages, dates and references are compared
+    as locale independent canonical values (see normalization.py), as long as
+    every compared language has a locale definition; otherwise raw tokens are used.
+
+    cache = ResultCache (or a path to one) stores the comparison of every paragraph
+    tuple under a hash of its texts, settings and CHECKER_VERSION, so unchanged
+    paragraphs of a re-issued document are not checked again.
+    """
+    def __init__(self, languages, highlight_dir=None, workers=1, chunk_size=16, mode="reference",
+                 normalize=True, cache=None, align=False, report=None, acronym_index=False,
+                 suppression=None):
+        self.languages = list(languages)
+        if len(self.languages) < 2:
+            raise ValueError("At least two languages are needed for a comparison")
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+        self.mode = mode
+        self.normalize = normalize
+        self.align = align
+        self.acronym_index = acronym_index
+        self.reference = self.languages[0]
+        self.highlight_dir = Path(highlight_dir) if highlight_dir else None
+        if self.highlight_dir:
+            self.highlight_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = workers if workers > 0 else os.cpu_count()
+        self.chunk_size = max(1, chunk_size)
+        self.cache = ResultCache(cache) if isinstance(cache, (str, Path)) else cache
+        self.report = report
+        self.suppression = SuppressionList(suppression) if isinstance(suppression, (str, Path)) else suppression
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        # The pool stays in the parent process, workers only need the settings
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        state["report"] = None
+        state["suppression"] = None
+        return state
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self.cache is not None:
+            self.cache.close()
+        if self.report is not None:
+            self.report.close()
+        if self.suppression is not None:
+            self.suppression.save()
+            self.suppression = None
+
+    def _map(self, fn, tasks):
+        if self.workers <= 1:
+            return map(fn, tasks)
+        if self._pool is None:
+            # Started once and reused for every following document / batch
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        if metrics.is_enabled():
+            return _merge_metrics(self._pool.map(partial(_measured, fn), tasks, chunksize=self.chunk_size))
+        return self._pool.map(fn, tasks, chunksize=self.chunk_size)
+
+    def _cache_key(self, paragraphs):
+        texts = [paragraphs[lang]["para"] for lang in self.languages]
+        return content_key(CHECKER_VERSION, self.mode, self.normalize, self.languages, texts)
+
+    def _run(self, tasks):
+        """
+        Yields (task, comparisons) in input order. Cache hits are answered here,
+        only the misses go to compare_paragraphs (on the workers when enabled).
+        Tasks are taken in windows, so a task stream is never fully materialized.
+        """
+        tasks = iter(tasks)
+        window = self.workers * self.chunk_size * 4
+        while True:
+            batch = list(islice(tasks, window))
+            if not batch:
+                return
+            keys = [None] * len(batch)
+            comparisons = [None] * len(batch)
+            pending = []
+            for i, (paragraphs, _, _) in enumerate(batch):
+                if self.cache is not None:
+                    keys[i] = self._cache_key(paragraphs)
+                    comparisons[i] = self.cache.get(keys[i])
+                if comparisons[i] is None:
+                    pending.append(i)
+
+            computed = self._map(self.compare_paragraphs, [batch[i][0] for i in pending])
+            for i, result in zip(pending, computed):
+                comparisons[i] = result
+                if self.cache is not None:
+                    self.cache.put(keys[i], result)
+            if self.cache is not None:
+                # One write transaction per window
+                self.cache.flush()
+            yield from zip(batch, comparisons)
+
+    def paragraph_rows(self, document, name=None):
+        """
+        Pairs the paragraphs of a document across the languages: by position, or
+        with align=True by paragraph_align.align_document, which follows split,
+        merged and missing paragraphs. Returns [{lang: paragraph}].
+        """
+        if self.align:
+            try:
+                return align_document(document, self.languages)
+            except ValueError as e:
+                # A band as wide as the document always has an alignment, it is only slower
+                log.warning("%s: %s, aligning it again over the whole document", name or "document", e)
+                band = max(len(document[lang]) for lang in self.languages) + 1
+                return align_document(document, self.languages, band=band)
+        return [dict(zip(self.languages, row)) for row in zip(*[document[lang] for lang in self.languages])]
+
+    def _paragraph_tasks(self, document, name, rows=None):
+        if rows is None:
+            rows = self.paragraph_rows(document, name)
+        for par_num, paragraphs in enumerate(rows):
+            yield paragraphs, par_num, name
+
+    def extractor(self, languages):
+        # Canonical values only when all languages can be normalized, so both sides stay comparable
+        if self.normalize and all(is_supported(lang) for lang in languages):
+            return canonical_numbers
+        return raw_numbers
+
+    @metrics.timed("compare_paragraphs")
+    def compare_paragraphs(self, paragraphs):
+        """
+        paragraphs = {lang: {"para": str, "para_number": int}} for one paragraph
+        Returns [(lang_a, lang_b, result)] for every compared language pair.
+        """
+        if metrics.is_enabled():
+            metrics.count("paragraph_tuples")
+            for lang in self.languages:
+                metrics.observe("paragraph_chars", len(paragraphs[lang]["para"]))
+        if self.mode == "consensus":
+            texts = {lang: paragraphs[lang]["para"] for lang in self.languages}
+            pivot, results = check_paragraphs_consensus(texts, self.languages, extract=self.extractor(self.languages))
+            return [(pivot, lang, result) for lang, result in results]
+
+        par_ref = paragraphs[self.reference]["para"]
+        # The reference tokens per extractor, so they're extracted once per row
+        ref_numbers = {}
+        comparisons = []
+        for lang in self.languages[1:]:
+            extract = self.extractor((self.reference, lang))
+            if extract not in ref_numbers:
+                ref_numbers[extract] = extract(par_ref, self.reference)
+            par_other = paragraphs[lang]["para"]
+            result = check_paragraph_pair(
+                par_ref, par_other,
+                numbers_a=ref_numbers[extract],
+                numbers_b=extract(par_other, lang),
+            )
+            comparisons.append((self.reference, lang, result))
+        return comparisons
+
+    def document_index(self, document):
+        return DocumentAcronymIndex(document, self.languages) if self.acronym_index else None
+
+    def _findings(self, task, comparisons, index=None):
+        paragraphs, par_num, name = task
+        findings = []
+        for lang_a, lang_b, result in comparisons:
+            if not (result["errors_a"] or result["errors_b"]):
+                continue
+            par_a, par_b = paragraphs[lang_a], paragraphs[lang_b]
+            if self.suppression is not None:
+                self.suppression.record({"file": name, "lang_a": lang_a, "lang_b": lang_b, **result})
+                result = self.suppression.suppress(result, lang_a, lang_b, par_a["para"], par_b["para"])
+            if index is not None and result["acronyms"]:
+                result = index.suppress(result, lang_a, lang_b, par_a["para"], par_b["para"])
+            if not (result["errors_a"] or result["errors_b"]):
+                # Everything in it was suppressed
+                continue
+
+            if self.highlight_dir:
+                highlight_words(
+                    par_a["para"], par_b["para"],
+                    result["spans_a"], result["spans_b"],
+                    out_file=self.highlight_dir / f'highlighted_{Path(name or "doc").stem}_{lang_a}_{lang_b}_{par_num}.txt'
+                )
+
+            finding = {
+                "file": name,
+                "par_num": par_num,
+                "para_number": par_a.get("para_number"),
+                "lang_a": lang_a,
+                "lang_b": lang_b,
+                **result,
+            }
+            if self.report is not None:
+                self.report.add(finding, paragraphs)
+            metrics.count("findings")
+            findings.append(finding)
+        return findings
+
+    def check_paragraphs(self, paragraphs, par_num, name=None):
+        """
+        paragraphs = {lang: {"para": str, "para_number": int}} for one paragraph
+        Returns the findings of every compared language pair with a mismatch.
+        """
+        findings = []
+        for task, comparisons in self._run([(paragraphs, par_num, name)]):
+            findings.extend(self._findings(task, comparisons))
+        return findings
+
+    def check_document(self, document, name=None, rows=None):
+        """
+        document = {lang: [{"para": str, "para_number": int}, ...]}
+        Paragraphs are paired by paragraph_rows (by position, or aligned with
+        align=True); rows can be passed in when the caller already paired them.
+        Returns a list of findings, par_num is the index into the rows.
+        """
+        index = self.document_index(document)
+        findings = []
+        for task, comparisons in self._run(self._paragraph_tasks(document, name, rows)):
+            findings.extend(self._findings(task, comparisons, index))
+        return findings
+
+    def check_batch(self, documents):
+        """
+        documents = output of load_documents
+        Returns a list of findings per document, in the order of the input, so
+        documents with the same (or no) file name are kept apart.
+        The paragraphs of all documents go into one task stream, so a batch of
+        small documents keeps every worker busy as well as one large document.
+        """
+        results = [[] for _ in documents]
+        indexes = [self.document_index(doc["para"]) for doc in documents]
+        # _run yields in input order, so the owner of each task is taken off the
+        # front as its comparisons come back
+        owners = deque()
+
+        def tasks():
+            for doc_num, doc in enumerate(documents):
+                for task in self._paragraph_tasks(doc["para"], doc["file"]):
+                    owners.append(doc_num)
+                    yield task
+
+        for task, comparisons in self._run(tasks()):
+            doc_num = owners.popleft()
+            results[doc_num].extend(self._findings(task, comparisons, indexes[doc_num]))
+        return results
+
+    def check_stream(self, aligned):
+        """
+        aligned = iterable of (file, par_num, {lang: paragraph}), e.g. streaming.iter_aligned
+        Yields the findings as their paragraphs are checked; only the current task
+        window is held in memory, so acronym_index (which needs whole documents) doesn't apply.
+        """
+        tasks = ((paragraphs, par_num, name) for name, par_num, paragraphs in aligned)
+        for task, comparisons in self._run(tasks):
+            yield from self._findings(task, comparisons)
+
+
+# ----------------------
+# CLI
+# ----------------------
+def parse_lang_paths(values):
+    paths = {}
+    for value in values:
+        lang, sep, path = value.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Expected LANG=PATH, got {value!r}")
+        paths[lang] = path
+    return paths
+
+
+def run(args):
+    paths = parse_lang_paths(args.inputs)
+    cache = ResultCache(args.cache, max_bytes=args.cache_max_mb * 1024 * 1024) if args.cache else None
+    report = ReportWriter(args.report) if args.report else None
+    with ConsistencyEngine(paths, highlight_dir=args.highlight_dir,
+                           workers=args.workers, chunk_size=args.chunk_size, mode=args.mode,
+                           normalize=not args.raw_tokens, cache=cache, align=args.align,
+                           report=report, acronym_index=args.acronym_index,
+                           suppression=args.suppression) as engine:
+        if args.stream:
+            out = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+            try:
+                for finding in engine.check_stream(iter_aligned(paths)):
+                    out.write(json.dumps(finding, ensure_ascii=False) + "\n")
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+        else:
+            documents = load_documents(paths)
+            results = [
+                {"file": doc["file"], "findings": findings}
+                for doc, findings in zip(documents, engine.check_batch(documents))
+            ]
+        if cache is not None:
+            print(f"cache: {json.dumps(cache.stats())}", file=sys.stderr)
+        if engine.suppression is not None:
+            print(f"suppression: {json.dumps(engine.suppression.stats())}", file=sys.stderr)
+    if args.stream:
+        return
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check numeric and acronym consistency across language versions.")
+    parser.add_argument("inputs", nargs="+",
+                        help="LANG=PATH to a parsed json or .docx file, the first one is the reference")
+    parser.add_argument("--out", help="Write all findings to this json file instead of stdout")
+    parser.add_argument("--highlight-dir", help="Also write highlighted paragraphs to this directory")
+    parser.add_argument("--report", help="Write all findings highlighted to one .jsonl, .html or .txt report")
+    parser.add_argument("--mode", choices=MODES, default="reference",
+                        help="Compare every language to the first one, or to the consensus of all languages")
+    parser.add_argument("--raw-tokens", action="store_true",
+                        help="Compare raw numeric tokens instead of locale normalized values")
+    parser.add_argument("--align", action="store_true",
+                        help="Align paragraphs across languages instead of pairing them by position")
+    parser.add_argument("--acronym-index", action="store_true",
+                        help="Don't report acronym pairs used consistently throughout a document (EU / ES)")
+    parser.add_argument("--suppression", help="JSON file of recurring mismatch pairs to learn from and filter out")
+    parser.add_argument("--cache", help="SQLite file to cache paragraph results in")
+    parser.add_argument("--cache-max-mb", type=int, default=512, help="Evict old cache entries above this size")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes, 0 = one per CPU")
+    parser.add_argument("--chunk-size", type=int, default=16, help="Paragraphs per task sent to a worker")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read the inputs incrementally and write the findings as JSON Lines")
+    parser.add_argument("--metrics", help="Collect stage timings and counters into this .json or .prom file")
+    parser.add_argument("--profile", help="Profile the run into this cProfile file (or .html with pyinstrument)")
+    args = parser.parse_args(argv)
+    if args.align and args.stream:
+        parser.error("--align needs whole documents and can't be combined with --stream")
+    if args.acronym_index and args.stream:
+        parser.error("--acronym-index needs whole documents and can't be combined with --stream")
+    if args.profile and args.workers != 1:
+        parser.error("--profile only sees this process, run it with --workers 1")
+    if args.metrics:
+        metrics.enable()
+
+    if args.profile:
+        with metrics.profile(args.profile):
+            run(args)
+    else:
+        run(args)
+    if args.metrics:
+        metrics.write(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from engine import ConsistencyEngine, load_documents
+from main_v2 import get_all_strings_containing_numbers, levenstein_distance, numeric_mismatches
+
+ROOT = Path(__file__).resolve().parent
+GROUND_TRUTH = ROOT / "data" / "errors_test_file.xlsx"
+LANGS = ["en", "de", "lv"]
+# The ground truth sheet describes the data/ sample; new_data/ is only timed and counted
+SAMPLES = {
+    "data": ROOT / "data" / "test_sample_{lang}_parsed.json",
+    "new_data": ROOT / "new_data" / "eval_sample_{lang}.json",
+}
+GROUND_TRUTH_SAMPLE = "data"
+
+# "(28)" is paragraph 28, "(28)3" the third paragraph after it (the dashed points of 28)
+LABEL_RE = re.compile(r"^\((\d+)\)(\d*)$")
+# Leading number of a paragraph: "(12)\t...", "1.\t...", "28      ..."
+LEAD_NUMBER_RE = re.compile(r"^\s*\(?(\d+)(?:\)|\.|\s)")
+FOOTNOTES_MARKER = "## Footnotes"
+
+
+# ----------------------
+# Ground truth
+# ----------------------
+def read_ground_truth(path=GROUND_TRUTH, languages=LANGS):
+    """
+    One sheet with a Paragraph column and one column per language holding the
+    mismatching values. Rows with only a Paragraph are section headings, rows
+    without a Paragraph belong to the paragraph of the row above.
+    Returns [{"label": str, "values": {lang: str or None}}]
+    """
+    # read_excel needs openpyxl for .xlsx files
+    df = pd.read_excel(path, dtype=str)
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    rows = []
+    label = None
+    for record in df.to_dict("records"):
+        values = {lang: _cell(record.get(lang)) for lang in languages}
+        if _cell(record.get("paragraph")) is not None:
+            label = _cell(record["paragraph"])
+        if not any(values.values()):
+            continue
+        rows.append({"label": label, "values": values})
+    return rows
+
+
+def _cell(value):
+    if value is None or pd.isna(value):
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _normalize_space(text):
+    return " ".join(text.replace("\xa0", " ").split())
+
+
+def locate_rows(rows, texts, reference=LANGS[0]):
+    """
+    texts = {lang: [paragraph text]} of one document
+    Sets row["locations"] to the paragraph indexes the error can be reported at:
+    the labelled paragraph, found by its leading number going forward through the
+    document, and the footnotes holding one of its values when the labelled
+    paragraph doesn't (values of a footnote reference live in the footnote).
+    """
+    paragraphs = texts[reference]
+    lead = [LEAD_NUMBER_RE.match(p) for p in paragraphs]
+    lead = [int(m.group(1)) if m else None for m in lead]
+    footnotes = next((i for i, p in enumerate(paragraphs) if FOOTNOTES_MARKER in p), len(paragraphs))
+    normalized = {lang: [_normalize_space(p) for p in texts[lang]] for lang in texts}
+
+    cursor = 0
+    for row in rows:
+        row["locations"] = set()
+        match = LABEL_RE.match(row["label"] or "")
+        if not match:
+            continue
+        number, offset = int(match.group(1)), int(match.group(2) or 0)
+        found = next((i for i in range(cursor, footnotes) if lead[i] == number), None)
+        if found is None:
+            found = next((i for i in range(footnotes) if lead[i] == number), None)
+        if found is None or found + offset >= len(paragraphs):
+            continue
+        cursor = found
+        index = found + offset
+        row["locations"].add(index)
+
+        values = {lang: _normalize_space(v) for lang, v in row["values"].items() if v and lang in normalized}
+        if not any(v in normalized[lang][index] for lang, v in values.items()):
+            row["locations"].update(
+                i for i in range(footnotes, len(paragraphs))
+                if any(v in normalized[lang][i] for lang, v in values.items())
+            )
+    return rows
+
+
+def score(predicted, rows):
+    """
+    predicted = set of paragraph indexes a stage reported
+    A reported paragraph is a true positive when it is the location of an error row,
+    an error row is found when one of its locations was reported.
+    """
+    located = [row for row in rows if row["locations"]]
+    locations = set().union(*(row["locations"] for row in located)) if located else set()
+    tp = len(predicted & locations)
+    found = sum(bool(row["locations"] & predicted) for row in located)
+    precision = tp / len(predicted) if predicted else 0.0
+    recall = found / len(located) if located else 0.0
+    return {
+        "true_positives": tp,
+        "false_positives": len(predicted) - tp,
+        "rows_found": found,
+        "rows": len(located),
+        "precision": precision,
+        "recall": recall,
+        "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+    }
+
+
+# ----------------------
+# Stages
+# ----------------------
+# Every stage gets (document = {lang: [paragraph dicts]}, languages, options) and
+# returns (set of reported paragraph indexes, number of checker calls)
+def numeric_stage(document, languages, options):
+    predicted, calls = set(), 0
+    for i, row in enumerate(zip(*(document[lang] for lang in languages))):
+        numbers = [get_all_strings_containing_numbers(p["para"]) for p in row]
+        for k in range(1, len(languages)):
+            calls += 1
+            if numeric_mismatches(numbers[0], numbers[k])["numeric"]:
+                predicted.add(i)
+    return predicted, calls
+
+
+def acronym_stage(document, languages, options):
+    predicted, calls = set(), 0
+    for i, row in enumerate(zip(*(document[lang] for lang in languages))):
+        for p in row[1:]:
+            calls += 1
+            if levenstein_distance(row[0]["para"], p["para"]):
+                predicted.add(i)
+    return predicted, calls
+
+
+def currency_stage(document, languages, options):
+    # Imported here, valuta_detection pulls in matplotlib
+    from scratch_files.currency import currency_codes
+    from scratch_files.valuta_detection import compare_currency_counts, make_paragraph_df
+
+    dfs = [make_paragraph_df([{"file": None, "para": document[lang]}]) for lang in languages]
+    result = compare_currency_counts(dfs, currency_codes, langs=languages)
+    position = {p["para_number"]: i for i, p in enumerate(document[languages[0]])}
+    predicted = {position[n] for n in result.index[result["has_mismatch"]] if n in position}
+    return predicted, sum(len(document[lang]) for lang in languages)
+
+
+def engine_stage(document, languages, options):
+    with ConsistencyEngine(languages, acronym_index=options.acronym_index,
+                           normalize=not options.raw_tokens) as engine:
+        findings = engine.check_document(document)
+        calls = len(engine.paragraph_rows(document)) * (len(languages) - 1)
+    return {f["par_num"] for f in findings}, calls
+
+
+def llm_stage(document, languages, options):
+    # The cascade with its LLM tier; calls are the requests sent to the model
+    from cascade import Cascade, make_llm_stage
+
+    stage = make_llm_stage(options.llm, options.llm_concurrency, options.llm_rate, options.llm_batch,
+                           options.llm_tokens)
+    with ConsistencyEngine(languages, acronym_index=options.acronym_index,
+                           normalize=not options.raw_tokens) as engine:
+        records = Cascade(engine, llm_stage=stage).run(document)
+    return {r["par_num"] for r in records}, stage.calls
+
+
+STAGES = {
+    "numeric": numeric_stage,
+    "acronyms": acronym_stage,
+    "currency": currency_stage,
+    "engine": engine_stage,
+    "llm": llm_stage,
+}
+
+
+def evaluate(documents, stages, options, rows=None, languages=LANGS):
+    """
+    documents = output of engine.load_documents, rows = located ground truth rows or None
+    Returns {stage: {"seconds", "calls", "reported", ...scores, "calls_per_true_positive"}}
+    """
+    results = {}
+    for name in stages:
+        predicted, calls, seconds = set(), 0, 0.0
+        for doc in documents:
+            start = time.perf_counter()
+            found, n = STAGES[name](doc["para"], languages, options)
+            seconds += time.perf_counter() - start
+            # Paragraph indexes of a batch are only unique per file
+            predicted |= {(doc["file"], i) for i in found}
+            calls += n
+        result = {"seconds": seconds, "calls": calls, "reported": len(predicted)}
+        if rows is not None:
+            result.update(score({i for _, i in predicted}, rows))
+            tp = result["true_positives"]
+            result["calls_per_true_positive"] = calls / tp if tp else None
+        results[name] = result
+    return results
+
+
+# ----------------------
+# CLI
+# ----------------------
+def print_table(sample, results, out=sys.stderr):
+    print(f"{sample}:", file=out)
+    for name, r in results.items():
+        line = f"  {name:>9}: {r['reported']:>4} reported {r['calls']:>6} calls {r['seconds']:>8.3f}s"
+        if "precision" in r:
+            per_tp = r["calls_per_true_positive"]
+            line += (f"  precision {r['precision']:.2f} recall {r['recall']:.2f} "
+                     f"({r['rows_found']}/{r['rows']} rows)  calls/TP ")
+            line += f"{per_tp:.1f}" if per_tp is not None else "-"
+        print(line, file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score the checkers against the ground truth spreadsheet.")
+    parser.add_argument("--ground-truth", default=str(GROUND_TRUTH))
+    parser.add_argument("--samples", nargs="+", choices=list(SAMPLES), default=list(SAMPLES))
+    parser.add_argument("--stages", nargs="+", choices=[s for s in STAGES if s != "llm"],
+                        default=[s for s in STAGES if s != "llm"])
+    parser.add_argument("--acronym-index", action="store_true", help="Engine stages use the document acronym index")
+    parser.add_argument("--raw-tokens", action="store_true", help="Engine stages compare raw numeric tokens")
+    parser.add_argument("--llm", choices=("fake", "watsonx", "gemini"), help="Also score the cascade with this LLM")
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--llm-rate", type=float, default=None, help="Max LLM requests per second")
+    parser.add_argument("--llm-batch", type=int, default=1, help="Paragraph tuples per prompt")
+    parser.add_argument("--llm-tokens", type=int, default=None,
+                        help="Pack the paragraph tuples into prompts of up to this many tokens")
+    parser.add_argument("--out", help="Write the results to this json file instead of stdout")
+    args = parser.parse_args(argv)
+
+    stages = args.stages + (["llm"] if args.llm else [])
+    report = {}
+    for sample in args.samples:
+        paths = {lang: str(SAMPLES[sample]).format(lang=lang) for lang in LANGS}
+        documents = load_documents(paths)
+        rows = None
+        if sample == GROUND_TRUTH_SAMPLE:
+            texts = {lang: [p["para"] for p in documents[0]["para"][lang]] for lang in LANGS}
+            rows = locate_rows(read_ground_truth(args.ground_truth), texts)
+            unlocated = [row["label"] for row in rows if not row["locations"]]
+            if unlocated:
+                print(f"{sample}: ground truth rows not found in the document: {unlocated}", file=sys.stderr)
+        report[sample] = evaluate(documents, stages, args, rows)
+        print_table(sample, report[sample])
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,69 @@
 import json
 import re
+import sys
+from bisect import bisect_left
 import numpy as np
+from scipy import sparse
 from scipy.optimize import linear_sum_assignment
 import Levenshtein
+from collections import defaultdict, deque
+from metrics import timed
+
+# ----------------------
+# Data model
+# ----------------------
+class NumericToken:
+    # A numeric token of a paragraph. The text is interned: the same amounts,
+    # years and references come back in every paragraph and language.
+    # start / end are character offsets, None when the extractor has no offsets.
+    __slots__ = ("text", "word_index", "start", "end")
+
+    def __init__(self, text, word_index, start=None, end=None):
+        self.text = sys.intern(text)
+        self.word_index = word_index
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"NumericToken({self.text!r}, {self.word_index})"
+
+class Alignment:
+    # Two aligned tokens of paragraph a and b, one side is None when unmatched
+    __slots__ = ("token_a", "token_b", "similarity")
+
+    def __init__(self, token_a, token_b, similarity=0.0):
+        self.token_a = token_a
+        self.token_b = token_b
+        self.similarity = similarity
+
+    @property
+    def text_a(self):
+        return self.token_a.text if self.token_a is not None else None
+
+    @property
+    def text_b(self):
+        return self.token_b.text if self.token_b is not None else None
+
+    def is_mismatch(self):
+        return self.text_a != self.text_b
+
+class Finding:
+    # A mismatching alignment as word positions and character offsets in both
+    # paragraphs. A token missing on one side is marked at the word position of
+    # the other side, its offsets are the empty span at missing_at_x (see missing_offset).
+    __slots__ = ("text_a", "text_b", "index_a", "index_b", "missing_a", "missing_b",
+                 "start_a", "end_a", "start_b", "end_b")
+
+    def __init__(self, alignment, missing_at_a=None, missing_at_b=None):
+        token_a, token_b = alignment.token_a, alignment.token_b
+        self.text_a = alignment.text_a
+        self.text_b = alignment.text_b
+        self.missing_a = token_a is None
+        self.missing_b = token_b is None
+        self.index_a = (token_a or token_b).word_index
+        self.index_b = (token_b or token_a).word_index
+        self.start_a, self.end_a = (missing_at_a, missing_at_a) if token_a is None else (token_a.start, token_a.end)
+        self.start_b, self.end_b = (missing_at_b, missing_at_b) if token_b is None else (token_b.start, token_b.end)
 
 # ----------------------
 # JSON Loading
@@ -12,9 +73,6 @@ def read_paragraphs_from_json(json_file):
         data = json.load(file)
     return data[0]["para"]
 
-paragraphs_en = read_paragraphs_from_json("eval_sample_en.json")
-paragraphs_lv = read_paragraphs_from_json("eval_sample_lv.json")
-
 # ----------------------
 # Text cleaning / numeric extraction
 # ----------------------
@@ -23,17 +81,43 @@ def clean_par(paragraph):
     words = paragraph.replace(" %", "%").replace("  %", "%").split()
     return words
 
+# Compiled once at import, shared by every paragraph that gets checked.
+# NUMERIC_TOKEN_RE finds the numeric tokens (percentages first) in the raw paragraph,
+# WORD_SEP_RE the whitespace runs that separate the words of clean_par. clean_par glues
+# '%' to the previous word when the run before it is "\xa0", "  " or "  \xa0".
+NUMERIC_TOKEN_RE = re.compile(r'\b(?P<pct>\d+)(?:  \xa0|  |\xa0)?%|\b\w*\d\w*\b')
+WORD_SEP_RE = re.compile(r'(?<!\s)(?:\s++(?!%)|(?!\xa0%|  %|  \xa0%)\s++)')
+
+def scan_numeric_tokens(paragraph):
+    # Returns [NumericToken], word indexes are the same as the positions in
+    # clean_par(paragraph), start / end the offsets in the raw paragraph
+    found = []
+    word_index = 0
+    pos = len(paragraph) - len(paragraph.lstrip())
+    for match in NUMERIC_TOKEN_RE.finditer(paragraph):
+        start, end = match.span()
+        word_index += len(WORD_SEP_RE.findall(paragraph, pos, start))
+        pos = end
+        pct = match.group("pct")
+        found.append(NumericToken(pct + "%" if pct else match.group(), word_index, start, end))
+    return found
+
+def word_spans(paragraph):
+    # [(start, end)] offsets of the words of clean_par(paragraph) in the raw paragraph
+    start = len(paragraph) - len(paragraph.lstrip())
+    stop = len(paragraph.rstrip())
+    spans = []
+    for sep in WORD_SEP_RE.finditer(paragraph, start, stop):
+        spans.append((start, sep.start()))
+        start = sep.end()
+    if start < stop:
+        spans.append((start, stop))
+    return spans
+
+@timed("extract_numbers")
 def get_all_strings_containing_numbers(paragraph):
-    words = clean_par(paragraph)
-    number_words = []
-    indexes = []
-    for i, word in enumerate(words):
-        tokens = re.findall(r'\b\d+%|\b\w+\b', word)
-        for token in tokens:
-            if re.search(r'\d', token):
-                number_words.append(token)
-                indexes.append(i)
-    return number_words, indexes
+    # [NumericToken] with word indexes and offsets, see scan_numeric_tokens
+    return scan_numeric_tokens(paragraph)
 
 def clean_token(token):
     return token
@@ -51,53 +135,126 @@ def numeric_similarity(a, b):
     union = len(a_nums | b_nums)
     return inter / union
 
-def semantic_align(seq1, seq2, indexes1, indexes2, placeholder=None):
-    n, m = len(seq1), len(seq2)
-    size = max(n, m)
-    cost = np.zeros((size, size))
-    for i in range(size):
-        for j in range(size):
-            if i < n and j < m:
-                sim = numeric_similarity(seq1[i], seq2[j])
-                cost[i, j] = 1 - sim
-            else:
-                cost[i, j] = 1
-    row_ind, col_ind = linear_sum_assignment(cost)
-    aligned1, aligned2 = [], []
-    aligned_idx1, aligned_idx2 = [], []
-    for i, j in zip(row_ind, col_ind):
-        val1 = seq1[i] if i < n else placeholder
-        val2 = seq2[j] if j < m else placeholder
-        aligned1.append(val1)
-        aligned2.append(val2)
-        idx1 = indexes1[i] if i < n else placeholder
-        idx2 = indexes2[j] if j < m else placeholder
-        aligned_idx1.append(idx1)
-        aligned_idx2.append(idx2)
-    similarity_score = 1 - cost[row_ind, col_ind].mean()
-    return aligned1, aligned2, aligned_idx1, aligned_idx2, similarity_score
+def build_similarity_matrix(seq1, seq2):
+    # Vectorized numeric_similarity over every (seq1[i], seq2[j]) pair.
+    # Tokens are interned to integer ids once; the extractors never produce tokens
+    # with whitespace, and for single part tokens the similarity is an exact match,
+    # which is a comparison of the ids.
+    vocab = {}
+    ids1 = np.array([vocab.setdefault(clean_token(t), len(vocab)) for t in seq1], dtype=np.intp)
+    ids2 = np.array([vocab.setdefault(clean_token(t), len(vocab)) for t in seq2], dtype=np.intp)
+    tokens = list(vocab)
+    # Empty tokens never match (same as numeric_similarity)
+    valid = np.array([bool(t) for t in tokens], dtype=bool)
+    if all(t.split() == [t] for t in tokens if t):
+        same = (ids1[:, None] == ids2[None, :]) & valid[ids1][:, None]
+        return same.astype(np.float64)
+
+    # Tokens with several parts: Jaccard overlap of the whitespace separated parts
+    # from a sparse token x part incidence matrix, once per unique token pair
+    parts = {}
+    rows, cols = [], []
+    for t_id, token in enumerate(tokens):
+        for part in set(token.split()):
+            rows.append(t_id)
+            cols.append(parts.setdefault(part, len(parts)))
+    incidence = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(tokens), len(parts)))
+    inter = (incidence @ incidence.T).toarray()
+    sizes = np.asarray(incidence.sum(axis=1)).ravel()
+    union = sizes[:, None] + sizes[None, :] - inter
+    unique_sim = np.divide(inter, union, out=np.zeros(inter.shape), where=union > 0)
+    # Identical tokens always match
+    np.fill_diagonal(unique_sim, 1.0)
+    unique_sim[~valid, :] = 0.0
+    unique_sim[:, ~valid] = 0.0
+
+    return unique_sim[np.ix_(ids1, ids2)]
+
+def exact_match_pass(seq1, seq2):
+    # Hash join of identical tokens, matched left to right by position.
+    # Returns the matched (i, j) pairs and the unmatched positions of both sides.
+    positions2 = defaultdict(deque)
+    for j, token in enumerate(seq2):
+        if token:
+            positions2[clean_token(token)].append(j)
+    matches, rest1 = [], []
+    for i, token in enumerate(seq1):
+        queue = positions2.get(clean_token(token)) if token else None
+        if queue:
+            matches.append((i, queue.popleft()))
+        else:
+            rest1.append(i)
+    matched2 = {j for _, j in matches}
+    rest2 = [j for j in range(len(seq2)) if j not in matched2]
+    return matches, rest1, rest2
+
+@timed("semantic_align")
+def align_numeric_tokens(tokens1, tokens2):
+    # Staged alignment: identical tokens are paired by the exact pass (an exact
+    # match is always part of an optimal assignment), only the residual goes
+    # through the Hungarian algorithm, on a rectangular matrix without padding.
+    # Returns ([Alignment], score): tokens1 in order, then the unpaired tokens2.
+    seq1 = [t.text for t in tokens1]
+    seq2 = [t.text for t in tokens2]
+    size = max(len(seq1), len(seq2))
+    matches, rest1, rest2 = exact_match_pass(seq1, seq2)
+    pair_of = {i: j for i, j in matches}
+    pair_sim = {i: 1.0 for i, _ in matches}
+    if rest1 and rest2:
+        sim = build_similarity_matrix([seq1[i] for i in rest1], [seq2[j] for j in rest2])
+        row_ind, col_ind = linear_sum_assignment(1 - sim)
+        for r, c in zip(row_ind, col_ind):
+            pair_of[rest1[r]] = rest2[c]
+            pair_sim[rest1[r]] = float(sim[r, c])
+    alignments = []
+    for i, token in enumerate(tokens1):
+        j = pair_of.get(i)
+        alignments.append(Alignment(token, tokens2[j] if j is not None else None, pair_sim.get(i, 0.0)))
+    paired2 = set(pair_of.values())
+    for j, token in enumerate(tokens2):
+        if j not in paired2:
+            alignments.append(Alignment(None, token))
+    similarity_score = sum(pair_sim.values()) / size if size else 1.0
+    return alignments, similarity_score
 
 # ----------------------
 # Highlighting functions
 # ----------------------
-def highlight_text(paragraph, highlight_indexes, missing_map, marker_start='[[', marker_end=']]'):
-    words = clean_par(paragraph)
-    highlighted_words = []
-    for i, word in enumerate(words):
-        if i % 10 == 0:
-            highlighted_words.append("\n")
-        if i in highlight_indexes:
-            if not missing_map.get(i, False):
-                highlighted_words.append(f"{marker_start}{word}{marker_end}")
-            else:
-                highlighted_words.append(f"{marker_start}MISSING VALUE{marker_end}{word}")
+def marked_spans(spans):
+    """
+    spans = result["spans_a"] or result["spans_b"], [start, end, missing] per error
+    Returns the (start, end, missing) spans to mark in text order, without duplicates
+    and overlaps (a token can be both a numeric and an acronym error).
+    """
+    marks = []
+    pos = 0
+    for start, end, missing in sorted({tuple(span) for span in spans if span[0] is not None}):
+        if start >= pos:
+            marks.append((start, end, bool(missing)))
+            pos = end
+    return marks
+
+def highlight_text(paragraph, marks, marker_start='[[', marker_end=']]', missing_text='MISSING VALUE'):
+    """
+    Inserts markers at the (start, end, missing) marks of the raw paragraph, keeping its spacing.
+    Mismatching tokens become [[token]], a value missing on this side is inserted as [[MISSING VALUE]].
+    """
+    parts = []
+    pos = 0
+    for start, end, missing in marks:
+        parts.append(paragraph[pos:start])
+        if missing:
+            parts.append(f"{marker_start}{missing_text}{marker_end}{paragraph[start:end]}")
         else:
-            highlighted_words.append(word)
-    return " ".join(highlighted_words)
+            parts.append(f"{marker_start}{paragraph[start:end]}{marker_end}")
+        pos = end
+    parts.append(paragraph[pos:])
+    return "".join(parts)
 
-def highlight_words(paragraph_a, paragraph_b, highlight_indexes_a, missing_map_a, highlight_indexes_b, missing_map_b, marker_start='[[', marker_end=']]', out_file='output.txt'):
-    highlighted_text_a = highlight_text(paragraph_a, highlight_indexes_a, missing_map_a, marker_start, marker_end)
-    highlighted_text_b = highlight_text(paragraph_b, highlight_indexes_b, missing_map_b, marker_start, marker_end)
+@timed("highlight_words")
+def highlight_words(paragraph_a, paragraph_b, spans_a, spans_b, marker_start='[[', marker_end=']]', out_file='output.txt'):
+    highlighted_text_a = highlight_text(paragraph_a, marked_spans(spans_a), marker_start, marker_end)
+    highlighted_text_b = highlight_text(paragraph_b, marked_spans(spans_b), marker_start, marker_end)
     with open(out_file, 'w', encoding='utf-8') as f:
         f.write(highlighted_text_a)
         f.write("\n\n\n")
@@ -113,59 +270,219 @@ def filter_out_words(input_text: str):
     short_words = [w for w in no_num if 1 < len(w) < 15 and w.isupper()]
     return short_words
 
+def acronym_occurrences(paragraph):
+    """
+    Returns {acronym: [positions in filter_out_words(paragraph)]}, in order of first occurrence.
+    """
+    occurrences = {}
+    for i, word in enumerate(filter_out_words(paragraph)):
+        occurrences.setdefault(word, []).append(i)
+    return occurrences
+
+def word_offsets(paragraph):
+    # {word without brackets: [(index in clean_par(paragraph), start, end) of every occurrence]}
+    offsets = defaultdict(list)
+    for i, (word, (start, end)) in enumerate(zip(clean_par(paragraph), word_spans(paragraph))):
+        offsets[word.replace('(', '').replace(')', '')].append((i, start, end))
+    return offsets
+
+# Up to this many word pairs comparing them directly is cheaper than building the index
+DIRECT_COMPARE_PAIRS = 64
+
+def substitution_keys(word):
+    # Two words of the same length share a key exactly when they differ in the letter at that position
+    return [(i, word[:i] + word[i + 1:]) for i in range(len(word))]
+
+def acronym_typos(occurrences_a, occurrences_b):
+    """
+    occurrences_x = acronym_occurrences of the two paragraphs
+    Returns [(word_a, word_b)] for the distinct words at Levenshtein distance 1 with
+    the same length (one substituted letter), found through a hash of substitution_keys
+    instead of comparing every pair of words.
+    """
+    # Only words with a counterpart of the same length can pair up
+    lengths = {len(w) for w in occurrences_a} & {len(w) for w in occurrences_b}
+    if not lengths:
+        return []
+    if len(occurrences_a) * len(occurrences_b) <= DIRECT_COMPARE_PAIRS:
+        return [
+            (word_a, word_b)
+            for word_a in occurrences_a
+            for word_b in occurrences_b
+            if len(word_a) == len(word_b) and Levenshtein.hamming(word_a, word_b) == 1
+        ]
+    index = defaultdict(list)
+    for word in occurrences_b:
+        if len(word) in lengths:
+            for key in substitution_keys(word):
+                index[key].append(word)
+    pairs = []
+    for word_a in occurrences_a:
+        if len(word_a) not in lengths:
+            continue
+        for key in substitution_keys(word_a):
+            pairs.extend((word_a, word_b) for word_b in index.get(key, ()) if word_b != word_a)
+    return pairs
+
+def typo_pair_occurrences(occurrences_one, occurrences_two, typos):
+    # One (word_one, word_two) per combination of occurrences, in text order
+    hits = []
+    for w1, w2 in typos:
+        hits.extend((i, j, w1, w2) for i in occurrences_one[w1] for j in occurrences_two[w2])
+    hits.sort()
+    return [(w1, w2) for _, _, w1, w2 in hits]
+
 def levenstein_distance(paragraph_one, paragraph_two):
-    words_one = filter_out_words(paragraph_one)
-    words_two = filter_out_words(paragraph_two)
-    return [
-        (w1, w2)
-        for w1 in words_one
-        for w2 in words_two
-        if Levenshtein.distance(w1, w2) == 1 and len(w1) == len(w2)
-    ]
+    """
+    Returns the acronym typo pairs, once per combination of occurrences,
+    in the order of the words in paragraph_one and then paragraph_two.
+    """
+    occurrences_one = acronym_occurrences(paragraph_one)
+    occurrences_two = acronym_occurrences(paragraph_two)
+    typos = acronym_typos(occurrences_one, occurrences_two)
+    return typo_pair_occurrences(occurrences_one, occurrences_two, typos)
+
+# ----------------------
+# Paragraph check
+# ----------------------
+def missing_offset(tokens, word_indexes, word_index):
+    # Where a token missing from this paragraph is marked: before its first token
+    # from word_index on (the word position of the other side), else after its last one
+    i = bisect_left(word_indexes, word_index)
+    if i < len(tokens):
+        return tokens[i].start
+    return tokens[-1].end if tokens else 0
+
+def mismatch_findings(alignments, tokens_a, tokens_b):
+    findings = []
+    indexes_a = indexes_b = None
+    for a in alignments:
+        if not a.is_mismatch():
+            continue
+        at_a = at_b = None
+        if a.token_a is None:
+            indexes_a = indexes_a or [t.word_index for t in tokens_a]
+            at_a = missing_offset(tokens_a, indexes_a, a.token_b.word_index)
+        if a.token_b is None:
+            indexes_b = indexes_b or [t.word_index for t in tokens_b]
+            at_b = missing_offset(tokens_b, indexes_b, a.token_a.word_index)
+        findings.append(Finding(a, at_a, at_b))
+    return findings
+
+def findings_result(findings, score):
+    """
+    [Finding] -> the result dict shared by the engine, the cache and the reports.
+    errors_x / missing_x are word positions, spans_x the [start, end, missing]
+    offsets in the raw paragraph, one per entry of errors_x.
+    """
+    errors_i_a, missing_map_a, spans_a = [], {}, []
+    errors_i_b, missing_map_b, spans_b = [], {}, []
+    numeric_pairs = []
+    for f in findings:
+        missing_map_a[f.index_a] = f.missing_a
+        missing_map_b[f.index_b] = f.missing_b
+        errors_i_a.append(f.index_a)
+        errors_i_b.append(f.index_b)
+        spans_a.append([f.start_a, f.end_a, f.missing_a])
+        spans_b.append([f.start_b, f.end_b, f.missing_b])
+        numeric_pairs.append((f.text_a, f.text_b))
+    return {
+        "numeric": numeric_pairs,
+        "acronyms": [],
+        "score": float(score),
+        "errors_a": errors_i_a,
+        "missing_a": missing_map_a,
+        "spans_a": spans_a,
+        "errors_b": errors_i_b,
+        "missing_b": missing_map_b,
+        "spans_b": spans_b,
+    }
+
+def numeric_mismatches(tokens_a, tokens_b):
+    # tokens_x = [NumericToken] as returned by get_all_strings_containing_numbers / canonical_numbers
+    alignments, score = align_numeric_tokens(tokens_a, tokens_b)
+    return findings_result(mismatch_findings(alignments, tokens_a, tokens_b), score)
+
+@timed("acronyms")
+def add_acronym_mismatches(result, paragraph_a, paragraph_b, keep=None):
+    # Every occurrence of a mismatching acronym is marked, after the numeric errors.
+    # keep(word_a, word_b) can drop pairs that are known not to be typos.
+    occurrences_a = acronym_occurrences(paragraph_a)
+    occurrences_b = acronym_occurrences(paragraph_b)
+    typos = acronym_typos(occurrences_a, occurrences_b)
+    if keep is not None:
+        typos = [(w1, w2) for w1, w2 in typos if keep(w1, w2)]
+    if typos:
+        offsets_a = word_offsets(paragraph_a)
+        offsets_b = word_offsets(paragraph_b)
+        marked_a, marked_b = set(), set()
+        for w1, w2 in typos:
+            for idx, start, end in offsets_a.get(w1, ()):
+                if idx not in marked_a:
+                    marked_a.add(idx)
+                    result["errors_a"].append(idx)
+                    result["missing_a"][idx] = False
+                    result["spans_a"].append([start, end, False])
+            for idx, start, end in offsets_b.get(w2, ()):
+                if idx not in marked_b:
+                    marked_b.add(idx)
+                    result["errors_b"].append(idx)
+                    result["missing_b"][idx] = False
+                    result["spans_b"].append([start, end, False])
+    result["acronyms"] = typo_pair_occurrences(occurrences_a, occurrences_b, typos)
+    return result
+
+def filter_acronyms(result, paragraph_a, paragraph_b, keep):
+    """
+    Returns a copy of result with only the acronym pairs for which keep(word_a, word_b)
+    is True; the numeric errors stay as they are.
+    """
+    # Numeric errors come first in errors_x, one per numeric pair
+    n = len(result["numeric"])
+    filtered = dict(result)
+    filtered["errors_a"] = result["errors_a"][:n]
+    filtered["errors_b"] = result["errors_b"][:n]
+    filtered["missing_a"] = {i: result["missing_a"][i] for i in filtered["errors_a"]}
+    filtered["missing_b"] = {i: result["missing_b"][i] for i in filtered["errors_b"]}
+    filtered["spans_a"] = result["spans_a"][:n]
+    filtered["spans_b"] = result["spans_b"][:n]
+    return add_acronym_mismatches(filtered, paragraph_a, paragraph_b, keep=keep)
+
+def check_paragraph_pair(paragraph_a, paragraph_b, numbers_a=None, numbers_b=None):
+    # numbers_a / numbers_b ([NumericToken]) can be passed in when the paragraph was already extracted
+    if numbers_a is None:
+        numbers_a = get_all_strings_containing_numbers(paragraph_a)
+    if numbers_b is None:
+        numbers_b = get_all_strings_containing_numbers(paragraph_b)
+    result = numeric_mismatches(numbers_a, numbers_b)
+    return add_acronym_mismatches(result, paragraph_a, paragraph_b)
 
 # ----------------------
 # Main loop
 # ----------------------
-for par_num, (par_en, par_lv) in enumerate(zip(paragraphs_en, paragraphs_lv)):
-    # Numeric alignment
-    number_words_en, number_words_indices_en = get_all_strings_containing_numbers(par_en["para"])
-    number_words_lv, number_words_indices_lv = get_all_strings_containing_numbers(par_lv["para"])
-    aligned_a, aligned_b, aligned_a_idx, aligned_b_idx, score = semantic_align(
-        number_words_en, number_words_lv, number_words_indices_en, number_words_indices_lv
-    )
-
-    errors_i_a, missing_map_a = [], {}
-    errors_i_b, missing_map_b = [], {}
-
-    # Numeric mismatches
-    for i in range(len(aligned_a)):
-        if aligned_a[i] != aligned_b[i]:
-            idx_a = aligned_a_idx[i] if aligned_a_idx[i] is not None else aligned_b_idx[i]
-            idx_b = aligned_b_idx[i] if aligned_b_idx[i] is not None else aligned_a_idx[i]
-            missing_map_a[idx_a] = (aligned_a_idx[i] is None)
-            missing_map_b[idx_b] = (aligned_b_idx[i] is None)
-            errors_i_a.append(idx_a)
-            errors_i_b.append(idx_b)
-
-    # Levenshtein mismatches
-    leven_pairs = levenstein_distance(par_en["para"], par_lv["para"])
-    words_en = clean_par(par_en["para"])
-    words_lv = clean_par(par_lv["para"])
-    for w1, w2 in leven_pairs:
-        # find first occurrence positions in the paragraph
-        if w1 in words_en:
-            idx = words_en.index(w1)
-            errors_i_a.append(idx)
-            missing_map_a[idx] = False
-        if w2 in words_lv:
-            idx = words_lv.index(w2)
-            errors_i_b.append(idx)
-            missing_map_b[idx] = False
-
-    if errors_i_a or errors_i_b:
-        highlight_words(
-            par_en["para"], par_lv["para"],
-            errors_i_a, missing_map_a,
-            errors_i_b, missing_map_b,
-            out_file=f'highlighted_{par_num}.txt'
-        )
+def main(en_file="eval_sample_en.json", lv_file="eval_sample_lv.json", report_file="highlighted.txt",
+         extract=get_all_strings_containing_numbers):
+    # extract(paragraph) -> [NumericToken], main.py passes its own tokenization
+    # report.py builds on this module, hence the import here
+    from report import ReportWriter
+
+    paragraphs_en = read_paragraphs_from_json(en_file)
+    paragraphs_lv = read_paragraphs_from_json(lv_file)
+
+    with ReportWriter(report_file) as report:
+        for par_num, (par_en, par_lv) in enumerate(zip(paragraphs_en, paragraphs_lv)):
+            result = check_paragraph_pair(par_en["para"], par_lv["para"],
+                                          numbers_a=extract(par_en["para"]), numbers_b=extract(par_lv["para"]))
+            if result["errors_a"] or result["errors_b"]:
+                finding = {
+                    "file": en_file,
+                    "par_num": par_num,
+                    "para_number": par_en.get("para_number"),
+                    "lang_a": "en",
+                    "lang_b": "lv",
+                    **result,
+                }
+                report.add(finding, {"en": par_en, "lv": par_lv})
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import cProfile
+import json
+import re
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+PREFIX = "consistency"
+# Upper bounds of the histogram buckets, the last bucket is +Inf
+TIME_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+SIZE_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536)
+
+# Off by default: every hook is a single flag check until enable() is called
+_enabled = False
+
+
+# ----------------------
+# Registry
+# ----------------------
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "max": self.max,
+            "buckets": list(self.buckets),
+            "counts": list(self.counts),
+        }
+
+
+class Registry:
+    """
+    Counters and histograms of one process. Timers are histograms of seconds
+    named <name>_seconds. snapshot() / merge() move them between processes.
+    """
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, value, buckets=SIZE_BUCKETS):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(buckets)
+        histogram.observe(value)
+
+    def reset(self):
+        self.counters.clear()
+        self.histograms.clear()
+
+    def snapshot(self):
+        return {
+            "counters": dict(self.counters),
+            "histograms": {name: h.as_dict() for name, h in self.histograms.items()},
+        }
+
+    def merge(self, snapshot):
+        for name, n in snapshot["counters"].items():
+            self.count(name, n)
+        for name, data in snapshot["histograms"].items():
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(data["buckets"])
+            histogram.counts = [a + b for a, b in zip(histogram.counts, data["counts"])]
+            histogram.count += data["count"]
+            histogram.sum += data["sum"]
+            histogram.max = max(histogram.max, data["max"])
+
+    def to_prometheus(self):
+        # Prometheus text exposition format
+        lines = []
+        for name, n in sorted(self.counters.items()):
+            metric = _metric_name(name) + "_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {n}"]
+        for name, h in sorted(self.histograms.items()):
+            metric = _metric_name(name)
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for le, n in zip([*h.buckets, "+Inf"], h.counts):
+                cumulative += n
+                lines.append(f'{metric}_bucket{{le="{le}"}} {cumulative}')
+            lines += [f"{metric}_sum {h.sum}", f"{metric}_count {h.count}"]
+        return "\n".join(lines) + "\n"
+
+
+def _metric_name(name):
+    return re.sub(r"[^a-zA-Z0-9_:]", "_", f"{PREFIX}_{name}")
+
+
+REGISTRY = Registry()
+
+
+# ----------------------
+# Hooks
+# ----------------------
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+def is_enabled():
+    return _enabled
+
+
+def count(name, n=1):
+    if _enabled:
+        REGISTRY.count(name, n)
+
+
+def observe(name, value, buckets=SIZE_BUCKETS):
+    if _enabled:
+        REGISTRY.observe(name, value, buckets)
+
+
+@contextmanager
+def timer(name):
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(name + "_seconds", time.perf_counter() - start, TIME_BUCKETS)
+
+
+def timed(name):
+    """Decorator: times every call of the function as <name>_seconds while enabled."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                REGISTRY.observe(name + "_seconds", time.perf_counter() - start, TIME_BUCKETS)
+        return wrapper
+    return decorate
+
+
+# ----------------------
+# Export / profiling
+# ----------------------
+def write(path):
+    # Prometheus text for .prom / .txt files, json otherwise
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix in (".prom", ".txt"):
+        text = REGISTRY.to_prometheus()
+    else:
+        text = json.dumps(REGISTRY.snapshot(), indent=2)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+@contextmanager
+def profile(path):
+    """
+    Profiles the block: with pyinstrument (if installed) into an .html report when
+    path ends in .html, otherwise with cProfile into a pstats file (snakeviz, pstats).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".html":
+        # Imported here, pyinstrument is optional
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(str(path))
@@ -0,0 +1,167 @@
+import re
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+from main_v2 import WORD_SEP_RE, NumericToken, get_all_strings_containing_numbers
+from metrics import timed
+
+# Typed canonical value of a numeric expression, comparable across languages:
+#   number     "779902.87"    from "779 902.87" (en), "779902,87" (de / lv)
+#   percent    "9%"           from "9 %", "9%"
+#   date       "2025-03-18"   from "18 March 2025", "18. März 2025", "2025. gada 18. marts"
+#   reference  "2021/947"     from "2021/947"
+Canonical = namedtuple("Canonical", ["kind", "value"])
+
+CACHE_SIZE = 1 << 16
+
+# ----------------------
+# Locale definitions
+# ----------------------
+MONTHS = {
+    "en": {
+        "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6,
+        "july": 7, "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+    },
+    "de": {
+        "januar": 1, "jänner": 1, "februar": 2, "märz": 3, "april": 4, "mai": 5, "juni": 6,
+        "juli": 7, "august": 8, "september": 9, "oktober": 10, "november": 11, "dezember": 12,
+    },
+    # Latvian month names are inflected (marts, martā, marta, ...), these are the stems
+    "lv": {
+        "janvār": 1, "februār": 2, "mart": 3, "aprīl": 4, "maij": 5, "jūnij": 6,
+        "jūlij": 7, "august": 8, "septembr": 9, "oktobr": 10, "novembr": 11, "decembr": 12,
+    },
+}
+
+SPACES = " \xa0"
+
+LOCALES = {
+    "en": {
+        "decimal": ".",
+        "groups": ",",
+        "date": r"(?P<day>\d{1,2})\s+(?P<month>MONTHS)\s+(?P<year>\d{4})",
+    },
+    "de": {
+        "decimal": ",",
+        "groups": ".",
+        "date": r"(?P<day>\d{1,2})\.\s*(?P<month>MONTHS)\s+(?P<year>\d{4})",
+    },
+    "lv": {
+        "decimal": ",",
+        "groups": "",
+        "date": r"(?P<year>\d{4})\.\s*gada\s+(?P<day>\d{1,2})\.\s*(?P<month>MONTHS)\w*",
+    },
+}
+
+NUMERIC_DATE = r"(?P<nday>\d{1,2})\.(?P<nmonth>\d{1,2})\.(?P<nyear>\d{4})"
+REFERENCE = r"(?P<ref>\d+/\d+)"
+
+
+def _number_pattern(decimal, groups):
+    # Grouped numbers need a 1-3 digit head and 3 digit groups, so "2025 200" stays two numbers
+    seps = re.escape(SPACES + groups)
+    dec = re.escape(decimal)
+    return rf"(?P<number>\d{{1,3}}(?:[{seps}]\d{{3}})+(?:{dec}\d+)?|\d+(?:{dec}\d+)?)(?P<percent>[{SPACES}]?%)?"
+
+
+@lru_cache(maxsize=None)
+def compile_locale(locale):
+    # One scanner per locale, alternatives in priority order
+    conf = LOCALES[locale]
+    months = "|".join(sorted(MONTHS[locale], key=len, reverse=True))
+    date = conf["date"].replace("MONTHS", months)
+    pattern = rf"\b(?:(?P<date>{date})|{NUMERIC_DATE}|{REFERENCE}|{_number_pattern(conf['decimal'], conf['groups'])})"
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def is_supported(locale):
+    return locale in LOCALES
+
+
+# ----------------------
+# Parsing
+# ----------------------
+def _month_number(locale, word):
+    word = word.lower()
+    for name, number in MONTHS[locale].items():
+        if word.startswith(name):
+            return number
+    return None
+
+
+def _canonical_number(raw, decimal):
+    digits = raw
+    for sep in SPACES + ",.":
+        if sep != decimal:
+            digits = digits.replace(sep, "")
+    try:
+        value = Decimal(digits.replace(decimal, "."))
+    except InvalidOperation:
+        return raw
+    return format(value.normalize(), "f")
+
+
+def _date(year, month, day):
+    return Canonical("date", f"{int(year):04d}-{int(month):02d}-{int(day):02d}")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_token(locale, raw):
+    """
+    Parse one raw numeric expression of the given locale into a Canonical value.
+    Cached on (locale, raw token): the same amounts, dates and references come
+    back in every paragraph and every document.
+    """
+    match = compile_locale(locale).fullmatch(raw)
+    if match is None:
+        return None
+    groups = match.groupdict()
+    if groups["date"]:
+        month = _month_number(locale, groups["month"])
+        return _date(groups["year"], month, groups["day"])
+    if groups["nday"]:
+        return _date(groups["nyear"], groups["nmonth"], groups["nday"])
+    if groups["ref"]:
+        return Canonical("reference", groups["ref"])
+    value = _canonical_number(groups["number"], LOCALES[locale]["decimal"])
+    if groups["percent"]:
+        return Canonical("percent", value + "%")
+    return Canonical("number", value)
+
+
+def canonical_values(paragraph, locale):
+    """
+    Scan a paragraph once for numeric expressions of the locale.
+    Returns [(Canonical, word index, start offset, end offset)], word indexes
+    line up with clean_par(paragraph) like scan_numeric_tokens.
+    """
+    found = []
+    word_index = 0
+    pos = len(paragraph) - len(paragraph.lstrip())
+    for match in compile_locale(locale).finditer(paragraph):
+        start, end = match.span()
+        word_index += len(WORD_SEP_RE.findall(paragraph, pos, start))
+        pos = start
+        canonical = normalize_token(locale, match.group())
+        if canonical is not None:
+            found.append((canonical, word_index, start, end))
+    return found
+
+
+@timed("extract_canonical")
+def canonical_numbers(paragraph, locale):
+    """
+    Drop-in for get_all_strings_containing_numbers: [NumericToken] whose text is the
+    canonical value, with the offsets of the raw expression. Falls back to the raw tokens for locales without a definition.
+    """
+    if not is_supported(locale):
+        return get_all_strings_containing_numbers(paragraph)
+    return [
+        NumericToken(canonical.value, word_index, start, end)
+        for canonical, word_index, start, end in canonical_values(paragraph, locale)
+    ]
+
+
+def cache_info():
+    return normalize_token.cache_info()
@@ -0,0 +1,193 @@
+import math
+import re
+
+# Bead types (paragraphs of a, paragraphs of b) with their prior probability (Gale & Church)
+BEADS = {
+    (1, 1): 0.89,
+    (1, 0): 0.0099,
+    (0, 1): 0.0099,
+    (2, 1): 0.089,
+    (1, 2): 0.089,
+}
+BEAD_COSTS = {bead: -math.log(p) for bead, p in BEADS.items()}
+
+# Variance of the length difference per character
+LENGTH_VARIANCE = 6.8
+# Upper bound of the length term, so markup (tables, footnote markers) in one
+# language can't outweigh matching labels and digits
+MAX_LENGTH_COST = 8.0
+
+# Leading recital / paragraph / point number: "(48)", "42", "3.", "(a)"
+LABEL_RE = re.compile(r"^\s*(?:\|\s*)?(\(\w{1,4}\)|\d+\.?)(?=[\s\xa0|])")
+DIGITS_RE = re.compile(r"\d+")
+
+LABEL_MATCH = -4.0
+LABEL_MISMATCH = 4.0
+DIGITS_WEIGHT = 4.0
+
+
+# ----------------------
+# Paragraph features
+# ----------------------
+def paragraph_features(text):
+    """
+    (length, label, set of digit runs) of one paragraph. Digit runs mostly survive
+    translation ("2021/947", "18 March 2025" / "18. März 2025"), so their overlap
+    is a language independent fingerprint.
+    """
+    match = LABEL_RE.match(text)
+    label = match.group(1).rstrip(".") if match else None
+    return len(text), label, frozenset(DIGITS_RE.findall(text))
+
+
+def _merge(features):
+    if len(features) == 1:
+        return features[0]
+    return sum(f[0] for f in features), features[0][1], features[0][2] | features[1][2]
+
+
+def _length_cost(len_a, len_b, ratio):
+    # -log of the probability that len_b is a translation of len_a
+    if len_a == 0 and len_b == 0:
+        return 0.0
+    mean = (len_a + len_b / ratio) / 2
+    delta = (len_b - len_a * ratio) / math.sqrt(max(mean, 1.0) * LENGTH_VARIANCE)
+    p = math.erfc(abs(delta) / math.sqrt(2))
+    return min(-math.log(max(p, 1e-300)), MAX_LENGTH_COST)
+
+
+def _digits_cost(digits_a, digits_b):
+    if not digits_a and not digits_b:
+        return 0.0
+    return DIGITS_WEIGHT * (1 - len(digits_a & digits_b) / len(digits_a | digits_b))
+
+
+def bead_cost(features_a, features_b, ratio):
+    bead = (len(features_a), len(features_b))
+    cost = BEAD_COSTS[bead]
+    if not features_a or not features_b:
+        # Deletion / insertion: a length term against 0 characters would make a
+        # merge with the neighbour always cheaper, so only the unmatched digits count
+        (_, _, digits), = features_a or features_b
+        return cost + (DIGITS_WEIGHT if digits else 0.0)
+    len_a, label_a, digits_a = _merge(features_a)
+    len_b, label_b, digits_b = _merge(features_b)
+    cost += _length_cost(len_a, len_b, ratio) + _digits_cost(digits_a, digits_b)
+    if label_a and label_b:
+        cost += LABEL_MATCH if label_a == label_b else LABEL_MISMATCH
+    # The continuation of a split paragraph has no label of its own
+    for _, label, _ in features_a[1:] + features_b[1:]:
+        if label:
+            cost += LABEL_MISMATCH
+    return cost
+
+
+# ----------------------
+# Alignment
+# ----------------------
+def align_paragraphs(paragraphs_a, paragraphs_b, band=None):
+    """
+    paragraphs_a, paragraphs_b = [str, ...] of one document in two languages
+    Dynamic programming over 1-1, 1-0, 0-1, 2-1 and 1-2 beads, scored on the
+    length ratio, leading paragraph labels and shared digit runs. Only cells within
+    `band` paragraphs of the diagonal are filled, so the run time is
+    O((len_a + len_b) * band) instead of O(len_a * len_b). The default band
+    allows a local drift of twice the difference in paragraph count.
+    Returns the beads as [(range over a, range over b)] covering both sides in order.
+    """
+    n, m = len(paragraphs_a), len(paragraphs_b)
+    features_a = [paragraph_features(p) for p in paragraphs_a]
+    features_b = [paragraph_features(p) for p in paragraphs_b]
+    total_a = sum(f[0] for f in features_a)
+    total_b = sum(f[0] for f in features_b)
+    ratio = total_b / total_a if total_a and total_b else 1.0
+    if band is None:
+        band = max(20, 2 * abs(n - m) + 10)
+
+    def in_band(i, j):
+        # Distance to the diagonal from (0, 0) to (n, m)
+        return abs(j - (i * m / n if n else 0)) <= band
+
+    cost = {(0, 0): 0.0}
+    back = {}
+    for i in range(n + 1):
+        centre = i * m / n if n else 0
+        for j in range(max(0, int(centre) - band), min(m, int(centre) + band + 1) + 1):
+            if (i, j) == (0, 0) or not in_band(i, j):
+                continue
+            best, best_bead = math.inf, None
+            for (da, db) in BEADS:
+                prev = (i - da, j - db)
+                if prev not in cost:
+                    continue
+                c = cost[prev] + bead_cost(features_a[i - da:i], features_b[j - db:j], ratio)
+                if c < best:
+                    best, best_bead = c, (da, db)
+            if best_bead is not None:
+                cost[i, j] = best
+                back[i, j] = best_bead
+
+    if (n, m) not in cost:
+        raise ValueError(f"No alignment within band {band}, use a wider band")
+    beads = []
+    i, j = n, m
+    while (i, j) != (0, 0):
+        da, db = back[i, j]
+        beads.append((range(i - da, i), range(j - db, j)))
+        i, j = i - da, j - db
+    beads.reverse()
+    return beads
+
+
+def _joined(paragraphs):
+    if not paragraphs:
+        return {"para": "", "para_number": None}
+    if len(paragraphs) == 1:
+        return paragraphs[0]
+    return {"para": "".join(p["para"] for p in paragraphs), "para_number": paragraphs[0].get("para_number")}
+
+
+def align_document(document, languages, band=None):
+    """
+    document = {lang: [{"para": str, "para_number": int}, ...]}
+    Every language is aligned to the first one. A row ends where all languages
+    have a bead boundary, so a paragraph that is split in one language and merged
+    in another ends up in one row. Merged paragraphs are concatenated, a paragraph
+    missing in a language becomes an empty one.
+    Returns [{lang: paragraph}] in document order, like zip over the languages
+    when nothing drifted.
+    """
+    reference = languages[0]
+    ref = document[reference]
+    beads = {}
+    for lang in languages[1:]:
+        beads[lang] = align_paragraphs([p["para"] for p in ref], [p["para"] for p in document[lang]], band)
+
+    # Reference positions where a row may end, and the other-language position reached there
+    ends = None
+    reached = {}
+    for lang, lang_beads in beads.items():
+        reached[lang] = {}
+        for range_a, range_b in lang_beads:
+            if range_a:
+                reached[lang][range_a.stop] = range_b.stop
+            else:
+                # Insertion in lang: attach it to the row that ends here
+                reached[lang][range_a.start] = range_b.stop
+        lang_ends = set(reached[lang])
+        ends = lang_ends if ends is None else ends & lang_ends
+    ends = sorted(e for e in (ends or {len(ref)}) if e > 0) or [len(ref)]
+    if ends[-1] != len(ref):
+        ends.append(len(ref))
+
+    rows = []
+    start = {lang: 0 for lang in languages}
+    for end in ends:
+        row = {reference: _joined(ref[start[reference]:end])}
+        start[reference] = end
+        for lang in languages[1:]:
+            stop = reached[lang].get(end, len(document[lang]))
+            row[lang] = _joined(document[lang][start[lang]:stop])
+            start[lang] = stop
+        rows.append(row)
+    return rows
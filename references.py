@@ -0,0 +1,133 @@
+import re
+import threading
+
+import metrics
+
+# Head words of legal references, the children of a head in the dependency tree
+# complete the reference ("Article 214", "Regulation (EU) 2021/947")
+REFERENCE_HEADS = {
+    "en": ["article", "point", "regulation", "paragraph", "annex", "directive"],
+    "de": ["artikel", "buchstabe", "verordnung", "absatz", "anhang", "richtlinie"],
+    "lv": ["panta", "punkta", "regulas", "pants", "punkts", "regula", "pielikuma", "direktīvas"],
+}
+
+# extract_references_stanza only reads word.text, word.id, word.head: no ner, no sentiment.
+# The same processors as the notebook; stanza adds mwt itself for the languages
+# whose package expects it (en, de), lv has no mwt model
+REFERENCE_PROCESSORS = "tokenize,pos,lemma,depparse"
+
+
+class PipelinePool:
+    """
+    One stanza Pipeline per (language, processors), created on first use and
+    reused afterwards. Models that are already downloaded are not fetched again.
+    """
+    def __init__(self, processors=REFERENCE_PROCESSORS, use_gpu=False, **options):
+        self.processors = processors
+        self.use_gpu = use_gpu
+        self.options = options
+        self._pipelines = {}
+        self._lock = threading.Lock()
+
+    def get(self, lang, processors=None):
+        key = (lang, processors or self.processors)
+        if key not in self._pipelines:
+            with self._lock:
+                if key not in self._pipelines:
+                    # Imported here, stanza pulls in torch
+                    import stanza
+                    with metrics.timer("model_load"):
+                        self._pipelines[key] = stanza.Pipeline(
+                            lang,
+                            processors=key[1],
+                            use_gpu=self.use_gpu,
+                            download_method=stanza.DownloadMethod.REUSE_RESOURCES,
+                            logging_level="WARN",
+                            **self.options,
+                        )
+        return self._pipelines[key]
+
+    def loaded(self):
+        return list(self._pipelines)
+
+
+def extract_references_stanza(doc, heads):
+    """Same as the contextual_similarity notebook: head word plus its direct children."""
+    refs = []
+    for s in doc.sentences:
+        for w in s.words:
+            if w.text.lower() in heads:
+                # Include token itself + all children in the dependency tree
+                subtree_words = [ww.text for ww in s.words if ww.head == w.id or ww.id == w.id]
+                refs.append(" ".join(subtree_words))
+    return refs
+
+
+class ReferenceExtractor:
+    """
+    Reference extraction for many paragraphs of one language at a time:
+    - paragraphs without any head word are skipped before parsing
+    - the rest goes through the pipeline batch_size documents per call
+    extract(paragraphs, lang) returns one list of references per paragraph.
+    """
+    def __init__(self, pool=None, heads=REFERENCE_HEADS, batch_size=32):
+        self.pool = pool or PipelinePool()
+        self.heads = {lang: set(words) for lang, words in heads.items()}
+        self.batch_size = batch_size
+        self._head_res = {}
+        self.parsed = 0
+        self.skipped = 0
+
+    def _head_re(self, lang):
+        if lang not in self._head_res:
+            words = sorted(self.heads[lang], key=len, reverse=True)
+            self._head_res[lang] = re.compile(r"\b(?:" + "|".join(map(re.escape, words)) + r")\b", re.IGNORECASE)
+        return self._head_res[lang]
+
+    def extract(self, paragraphs, lang):
+        paragraphs = list(paragraphs)
+        refs = [[] for _ in paragraphs]
+        if lang not in self.heads:
+            return refs
+        head_re = self._head_re(lang)
+        todo = [i for i, p in enumerate(paragraphs) if head_re.search(p)]
+        self.skipped += len(paragraphs) - len(todo)
+        if not todo:
+            return refs
+
+        import stanza
+        nlp = self.pool.get(lang)
+        heads = self.heads[lang]
+        for start in range(0, len(todo), self.batch_size):
+            batch = todo[start:start + self.batch_size]
+            docs = nlp([stanza.Document([], text=paragraphs[i]) for i in batch])
+            for i, doc in zip(batch, docs):
+                refs[i] = extract_references_stanza(doc, heads)
+            self.parsed += len(batch)
+        return refs
+
+    def extract_document(self, document, languages):
+        """
+        document = {lang: [{"para": str, "para_number": int}, ...]}
+        Returns {lang: [references per paragraph]}.
+        """
+        return {lang: self.extract((p["para"] for p in document[lang]), lang) for lang in languages}
+
+    def stats(self):
+        return {"parsed": self.parsed, "skipped": self.skipped, "pipelines": self.pool.loaded()}
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from engine import load_documents, parse_lang_paths
+
+    paths = parse_lang_paths(sys.argv[1:])
+    extractor = ReferenceExtractor()
+    start = time.perf_counter()
+    for document in load_documents(paths):
+        refs = extractor.extract_document(document["para"], list(paths))
+        for lang, per_par in refs.items():
+            print(lang, sum(map(len, per_par)), "references")
+    print(f"{time.perf_counter() - start:.2f}s {extractor.stats()}")
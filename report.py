@@ -0,0 +1,106 @@
+import html
+import json
+from pathlib import Path
+
+from main_v2 import highlight_text, marked_spans
+
+FORMATS = {".jsonl": "jsonl", ".html": "html", ".htm": "html", ".txt": "text"}
+
+HTML_HEAD = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Consistency report</title>
+<style>
+body { font-family: sans-serif; max-width: 70em; margin: auto; }
+section { border-top: 1px solid #ccc; padding: .5em 0; }
+.para { white-space: pre-wrap; margin: .5em 0; }
+mark { background: #ffd54f; }
+mark.missing { background: #ef9a9a; }
+</style></head><body>
+"""
+HTML_TAIL = "</body></html>\n"
+
+
+# ----------------------
+# Writer
+# ----------------------
+class ReportWriter:
+    """
+    All findings of a run in one buffered file instead of one file per paragraph.
+    fmt is "jsonl", "html" or "text", by default taken from the file extension.
+        with ReportWriter("report.html") as report:
+            report.add(finding, paragraphs)
+    finding = a finding of ConsistencyEngine, paragraphs = {lang: {"para": str, ...}}
+    The marks come from the offsets the extraction left in the finding (spans_a / spans_b),
+    the paragraphs aren't tokenized again.
+    """
+    def __init__(self, path, fmt=None, buffer_size=1 << 20):
+        self.path = Path(path)
+        self.fmt = fmt or FORMATS.get(self.path.suffix.lower(), "jsonl")
+        if self.fmt not in FORMATS.values():
+            raise ValueError(f"Unknown report format {self.fmt!r}")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, 'w', encoding='utf-8', buffering=buffer_size)
+        self.count = 0
+        if self.fmt == "html":
+            self._f.write(HTML_HEAD)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, finding, paragraphs):
+        par_a = paragraphs[finding["lang_a"]]["para"]
+        par_b = paragraphs[finding["lang_b"]]["para"]
+        marks_a = marked_spans(finding["spans_a"])
+        marks_b = marked_spans(finding["spans_b"])
+        getattr(self, "_write_" + self.fmt)(finding, par_a, par_b, marks_a, marks_b)
+        self.count += 1
+
+    def _write_jsonl(self, finding, par_a, par_b, marks_a, marks_b):
+        record = dict(finding)
+        record["highlight_a"] = highlight_text(par_a, marks_a)
+        record["highlight_b"] = highlight_text(par_b, marks_b)
+        self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _write_text(self, finding, par_a, par_b, marks_a, marks_b):
+        self._f.write(
+            f"=== {finding['file']} paragraph {finding['para_number']} (#{finding['par_num']}) "
+            f"{finding['lang_a']}/{finding['lang_b']} score {finding['score']:.2f}\n"
+            f"{highlight_text(par_a, marks_a).rstrip()}\n\n{highlight_text(par_b, marks_b).rstrip()}\n\n"
+        )
+
+    def _write_html(self, finding, par_a, par_b, marks_a, marks_b):
+        pairs = ", ".join(f"{a} / {b}" for a, b in finding["numeric"] + finding["acronyms"])
+        self._f.write(
+            f"<section><h3>{html.escape(str(finding['file']))} paragraph {finding['para_number']} "
+            f"({finding['lang_a']}/{finding['lang_b']}, score {finding['score']:.2f})</h3>"
+            f"<p>{html.escape(pairs)}</p>"
+            f"<div class=\"para\" lang=\"{finding['lang_a']}\">"
+            f"{self._html_highlight(par_a, marks_a)}</div>"
+            f"<div class=\"para\" lang=\"{finding['lang_b']}\">"
+            f"{self._html_highlight(par_b, marks_b)}</div></section>\n"
+        )
+
+    @staticmethod
+    def _html_highlight(paragraph, marks):
+        # Missing values get their own mark class
+        parts = []
+        pos = 0
+        for s, e, is_missing in marks:
+            parts.append(html.escape(paragraph[pos:s]))
+            if is_missing:
+                # An empty span where a value of the other language has no counterpart
+                parts.append('<mark class="missing" title="missing in this language">MISSING VALUE</mark>')
+            else:
+                parts.append(f"<mark>{html.escape(paragraph[s:e])}</mark>")
+            pos = e
+        parts.append(html.escape(paragraph[pos:]))
+        return "".join(parts)
+
+    def close(self):
+        if self._f is not None:
+            if self.fmt == "html":
+                self._f.write(HTML_TAIL)
+            self._f.close()
+            self._f = None
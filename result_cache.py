@@ -0,0 +1,141 @@
+import hashlib
+import json
+import pickle
+import sqlite3
+import time
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Buffered puts are written once this many are pending, even without a flush()
+MAX_PENDING = 1024
+
+
+def content_key(*parts):
+    """
+    Content address of a cache entry: sha256 over the json of all parts, e.g.
+    (checker version, settings, tuple of language paragraphs).
+    """
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk cache of checker results keyed by content hash, stored in SQLite.
+    Values are pickled. When the stored values grow over max_bytes the least
+    recently used entries are evicted down to 90% of the limit.
+    Counts hits and misses of this process in self.hits / self.misses.
+    Puts and the last used times of hits are buffered and written by flush() in
+    one transaction; the engine flushes once per task window, close() flushes the rest.
+    """
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._total = None
+        self._pending = {}
+        self._touched = {}
+
+    def __getstate__(self):
+        # Connections can't cross processes, every process opens its own
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_total"] = None
+        state["_pending"] = {}
+        state["_touched"] = {}
+        return state
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL,"
+                " size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+            self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        return self._conn
+
+    def get(self, key):
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.hits += 1
+            return pickle.loads(pending[0])
+        row = self.conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched[key] = time.time()
+        return pickle.loads(row[0])
+
+    def put(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if key in self._pending:
+            old = self._pending[key][1]
+        else:
+            row = self.conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            old = row[0] if row else 0
+        self._pending[key] = (blob, len(blob), time.time())
+        self._total += len(blob) - old
+        if len(self._pending) >= MAX_PENDING or self._total > self.max_bytes:
+            self.flush()
+
+    def flush(self):
+        # Writes the buffered puts and last used times in one transaction
+        if not (self._pending or self._touched):
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO results (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                [(key, blob, size, used) for key, (blob, size, used) in self._pending.items()],
+            )
+            self.conn.executemany(
+                "UPDATE results SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items() if key not in self._pending],
+            )
+        self._pending.clear()
+        self._touched.clear()
+        if self._total > self.max_bytes:
+            self.evict(int(self.max_bytes * 0.9))
+
+    def size(self):
+        # Bytes of all stored values, the total is loaded when the connection opens
+        _ = self.conn
+        return self._total
+
+    def evict(self, target_bytes):
+        # Drop least recently used entries until the total size is at most target_bytes
+        self.flush()
+        evicted = []
+        for key, size in self.conn.execute("SELECT key, size FROM results ORDER BY last_used"):
+            if self._total <= target_bytes:
+                break
+            evicted.append((key,))
+            self._total -= size
+        with self.conn:
+            self.conn.executemany("DELETE FROM results WHERE key = ?", evicted)
+        return len(evicted)
+
+    def stats(self):
+        self.flush()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0],
+            "bytes": self.size(),
+        }
+
+    def close(self):
+        if self._conn is not None:
+            self.flush()
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,296 @@
+import re
+from collections import Counter
+
+from metrics import timed
+
+currency_symbols = [
+    "$",   # Dollar (USD, CAD, AUD, etc.)
+    "€",   # Euro
+    "¥",   # Yen/Yuan
+    "£",   # Pound
+    "₣",   # Franc (historic, still used in some)
+    "₩",   # South Korean Won
+    "₹",   # Indian Rupee
+    "₽",   # Russian Ruble
+    "R$",  # Brazilian Real
+    "R",   # South African Rand
+    "₺",   # Turkish Lira
+    "₪",   # Israeli Shekel
+    "﷼",   # Generic Rial/Riyal (SAR, QAR, OMR, IRR, YER)
+    "د.إ", # UAE Dirham
+    "₱",   # Philippine Peso
+    "₫",   # Vietnamese Dong
+    "₦",   # Nigerian Naira
+    "د.ج", # Algerian Dinar
+    "د.ك", # Kuwaiti Dinar
+    "ج.م", # Egyptian Pound
+    "د.ت", # Tunisian Dinar
+    "ر.ق", # Qatari Riyal
+    "د.ب", # Bahraini Dinar
+    "ل.ل", # Lebanese Pound
+    "฿",   # Thai Baht
+    "₭",   # Lao Kip
+    "₮",   # Mongolian Tögrög
+    "₴",   # Ukrainian Hryvnia
+    "лв",  # Bulgarian Lev
+    "Ft",  # Hungarian Forint
+    "zł",  # Polish Zloty
+    "kr",  # Nordic Krona/Krone (SEK, NOK, DKK, ISK)
+    "Kč",  # Czech Koruna
+    "lei", # Romanian Leu
+    "DH",  # Moroccan Dirham (common abbreviation)
+    "₲",   # Paraguayan Guaraní
+    "₡",   # Costa Rican Colón
+    "₵",   # Ghanaian Cedi
+    "₸",   # Kazakhstani Tenge
+    "₼",   # Azerbaijani Manat
+    "ман", # Turkmenistani Manat
+    "ден", # Macedonian Denar
+    "؋",   # Afghan Afghani
+    "Br",  # Ethiopian Birr / Belarusian Ruble
+    "₨",   # Generic Rupee (Sri Lanka, Nepal, Pakistan, etc.)
+]
+
+
+currency_codes = [
+    "AED", "AFN", "ALL", "AMD", "ANG", "AOA", "ARS", "AUD", "AWG", "AZN",
+    "BAM", "BBD", "BDT", "BGN", "BHD", "BIF", "BMD", "BND", "BOB", "BRL",
+    "BSD", "BTN", "BWP", "BYN", "BZD", "CAD", "CDF", "CHF", "CLP", "CNY",
+    "COP", "CRC", "CUP", "CVE", "CZK", "DJF", "DKK", "DOP", "DZD", "EGP",
+    "ERN", "ETB", "EUR", "FJD", "FKP", "FOK", "GBP", "GEL", "GGP", "GHS",
+    "GIP", "GMD", "GNF", "GTQ", "GYD", "HKD", "HNL", "HRK", "HTG", "HUF",
+    "IDR", "ILS", "IMP", "INR", "IQD", "IRR", "ISK", "JEP", "JMD", "JOD",
+    "JPY", "KES", "KGS", "KHR", "KID", "KMF", "KRW", "KWD", "KYD", "KZT",
+    "LAK", "LBP", "LKR", "LRD", "LSL", "LYD", "MAD", "MDL", "MGA", "MKD",
+    "MMK", "MNT", "MOP", "MRU", "MUR", "MVR", "MWK", "MXN", "MYR", "MZN",
+    "NAD", "NGN", "NIO", "NOK", "NPR", "NZD", "OMR", "PAB", "PEN", "PGK",
+    "PHP", "PKR", "PLN", "PYG", "QAR", "RON", "RSD", "RUB", "RWF", "SAR",
+    "SBD", "SCR", "SDG", "SEK", "SGD", "SHP", "SLE", "SOS", "SRD", "SSP",
+    "STN", "SYP", "SZL", "THB", "TJS", "TMT", "TND", "TOP", "TRY", "TTD",
+    "TVD", "TWD", "TZS", "UAH", "UGX", "USD", "UYU", "UZS", "VES", "VND",
+    "VUV", "WST", "XAF", "XCD", "XOF", "XPF", "YER", "ZAR", "ZMW", "ZWL"
+]
+
+
+currency_names = [
+    "united arab emirates dirham",
+    "afghan afghani",
+    "albanian lek",
+    "armenian dram",
+    "netherlands antillean guilder",
+    "angolan kwanza",
+    "argentine peso",
+    "australian dollar",
+    "aruban florin",
+    "azerbaijani manat",
+    "bosnia and herzegovina convertible mark",
+    "barbados dollar",
+    "bangladeshi taka",
+    "bulgarian lev",
+    "bahraini dinar",
+    "burundian franc",
+    "bermudian dollar",
+    "brunei dollar",
+    "bolivian boliviano",
+    "brazilian real",
+    "bahamian dollar",
+    "bhutanese ngultrum",
+    "botswana pula",
+    "belarusian ruble",
+    "belize dollar",
+    "canadian dollar",
+    "congolese franc",
+    "swiss franc",
+    "chilean peso",
+    "chinese yuan renminbi",
+    "colombian peso",
+    "costa rican colón",
+    "cuban peso",
+    "cape verdean escudo",
+    "czech koruna",
+    "djiboutian franc",
+    "danish krone",
+    "dominican peso",
+    "algerian dinar",
+    "egyptian pound",
+    "eritrean nakfa",
+    "ethiopian birr",
+    "euro",
+    "fiji dollar",
+    "falkland islands pound",
+    "faroese krona",
+    "pound sterling",
+    "georgian lari",
+    "guernsey pound",
+    "ghanaian cedi",
+    "gibraltar pound",
+    "gambian dalasi",
+    "guinean franc",
+    "guatemalan quetzal",
+    "guyana dollar",
+    "hong kong dollar",
+    "honduran lempira",
+    "croatian kuna",     # replaced by euro in 2023, still ISO
+    "haitian gourde",
+    "hungarian forint",
+    "indonesian rupiah",
+    "israeli new shekel",
+    "jersey pound",
+    "indian rupee",
+    "iraqi dinar",
+    "iranian rial",
+    "icelandic krona",
+    "jersey pound",
+    "jamaican dollar",
+    "jordanian dinar",
+    "japanese yen",
+    "kenyan shilling",
+    "kyrgyzstani som",
+    "cambodian riel",
+    "kiribati dollar",
+    "comorian franc",
+    "south korean won",
+    "kuwaiti dinar",
+    "cayman islands dollar",
+    "kazakhstani tenge",
+    "lao kip",
+    "lebanese pound",
+    "sri lanka rupee",
+    "liberian dollar",
+    "lesotho loti",
+    "libyan dinar",
+    "moroccan dirham",
+    "moldovan leu",
+    "malagasy ariary",
+    "macedonian denar",
+    "myanmar kyat",
+    "mongolian tögrög",
+    "macanese pataca",
+    "mauritanian ouguiya",
+    "mauritian rupee",
+    "maldivian rufiyaa",
+    "malawian kwacha",
+    "mexican peso",
+    "malaysian ringgit",
+    "mozambican metical",
+    "namibian dollar",
+    "nigerian naira",
+    "nicaraguan córdoba",
+    "norwegian krone",
+    "nepalese rupee",
+    "new zealand dollar",
+    "omani rial",
+    "panamanian balboa",
+    "peruvian sol",
+    "papua new guinea kina",
+    "philippine peso",
+    "pakistani rupee",
+    "polish złoty",
+    "paraguayan guaraní",
+    "qatari riyal",
+    "romanian leu",
+    "serbian dinar",
+    "russian ruble",
+    "rwandan franc",
+    "saudi riyal",
+    "solomon islands dollar",
+    "seychelles rupee",
+    "sudanese pound",
+    "swedish krona",
+    "singapore dollar",
+    "saint helena pound",
+    "sierra leonean leone",
+    "somali shilling",
+    "surinamese dollar",
+    "south sudanese pound",
+    "são tomé and príncipe dobra",
+    "syrian pound",
+    "eswatini lilangeni",
+    "thai baht",
+    "tajikistani somoni",
+    "turkmenistani manat",
+    "tunisian dinar",
+    "tongan paʻanga",
+    "turkish lira",
+    "trinidad and tobago dollar",
+    "tuvaluan dollar",
+    "new taiwan dollar",
+    "tanzanian shilling",
+    "ukrainian hryvnia",
+    "ugandan shilling",
+    "united states dollar",
+    "uruguayan peso",
+    "uzbekistani som",
+    "venezuelan bolívar",
+    "vietnamese đồng",
+    "vanuatu vatu",
+    "samoan tālā",
+    "central african cfa franc",
+    "east caribbean dollar",
+    "west african cfa franc",
+    "cfp franc",
+    "yemeni rial",
+    "south african rand",
+    "zambian kwacha",
+    "zimbabwean dollar"
+]
+
+
+
+# ----------------------
+# Single pass detector
+# ----------------------
+def trie_regex(words):
+    """
+    Build one regex alternation shaped like a trie of the words, so the regex
+    engine only follows the branch of the next character instead of trying
+    every word at every position. Longer words win over their prefixes.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        end = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if end else body
+
+    return build(trie)
+
+
+# Symbols made of letters (R, kr, Ft, ...) only count as whole words, the others anywhere
+word_symbols = [s for s in currency_symbols if re.fullmatch(r"\w+", s)]
+other_symbols = [s for s in currency_symbols if s not in word_symbols]
+
+CURRENCY_RE = re.compile(
+    rf"(?P<name>(?i:\b{trie_regex(sorted(set(currency_names)))}\b))"
+    rf"|(?P<code>\b{trie_regex(currency_codes)}\b)"
+    rf"|(?P<symbol>{trie_regex(other_symbols)})"
+    rf"|(?P<word_symbol>\b{trie_regex(word_symbols)}\b)"
+)
+
+
+def scan_currencies(text):
+    """
+    Scan a paragraph once for currency names (case-insensitive), ISO codes
+    (case-sensitive), and symbols.
+    Returns [(key, kind, start, end)], key is the code, symbol or lowercase name.
+    """
+    found = []
+    for match in CURRENCY_RE.finditer(text):
+        kind = match.lastgroup
+        key = match.group().lower() if kind == "name" else match.group()
+        found.append((key, kind, match.start(), match.end()))
+    return found
+
+
+@timed("count_currencies")
+def count_currencies(text, kinds=None):
+    """Counter of currency keys in the text, optionally restricted to some kinds ("code", "name", ...)."""
+    return Counter(key for key, kind, _, _ in scan_currencies(text) if kinds is None or kind in kinds)
@@ -33,3 +33,10 @@ class Gemini:
         text = json.dumps(chunk)
         return len(self.encoder.encode(text))
 
+    def count_tokens(self, text):
+        """
+        tokens of a plain string, without the json quoting of calc_token_count
+        (which escapes every non-ascii character and inflates de/lv text)
+        """
+        return len(self.encoder.encode(text))
+
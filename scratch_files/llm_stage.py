@@ -0,0 +1,382 @@
+import asyncio
+import random
+import re
+import time
+
+import metrics
+from result_cache import content_key
+
+# Part of the cache key of every verdict: bump it whenever the prompts change
+PROMPT_VERSION = "1"
+
+# Same instructions as find_errors in reading_json.py, for any number of languages
+SINGLE_PROMPT = (
+    "You will be given {n} paragraphs in different languages. The text should be exactly the same. However,"
+    "sometimes errors occur. Check the paragraph below and look specifically for the numbers and dates."
+    "See if there are errors/mismatches between the paragraphs. You need to return 1 or 0, when there is a "
+    "error/mismatch then return 1 otherwise 0. Also add what is wrong! You should follow this format:"
+    "'1:err1:err2:errX' DO NOT ANSWER ANYTHING ELSE APART FROM THIS FORMAT!!! Also don't write err1 or err2, this "
+    "needs to be substituded by the actual error. Don't give an explanation, only give the format nothing more nothing"
+    "less! Be as accurate"
+    " as possible, because this is extreemly important!\n\n"
+)
+
+BATCH_PROMPT = (
+    "You will be given {count} items. Every item holds {n} paragraphs in different languages that should say "
+    "exactly the same. Look specifically for the numbers and dates and check for errors/mismatches between the "
+    "paragraphs of each item. Answer with exactly one line per item in this format: "
+    "'ITEM:1:err1:err2:errX' when there is an error/mismatch, 'ITEM:0' otherwise, where ITEM is the item number "
+    "and err1, err2 are the actual errors. DO NOT ANSWER ANYTHING ELSE APART FROM THIS FORMAT!!!\n\n"
+)
+
+# Counter of every answer by its flag
+VERDICT_METRICS = {True: "llm_flagged", False: "llm_clean", None: "llm_unanswered"}
+
+BATCH_LINE_RE = re.compile(r"^\s*(?:item\s*)?(\d+)\s*:\s*(.*)$", re.IGNORECASE)
+
+
+def build_prompt(paragraphs):
+    return SINGLE_PROMPT.format(n=len(paragraphs)) + "\n\n".join(str(p) for p in paragraphs)
+
+
+def format_item(item, paragraphs):
+    return f"ITEM {item}:\n" + "\n\n".join(str(p) for p in paragraphs)
+
+
+def build_batch_prompt(batch):
+    parts = [BATCH_PROMPT.format(count=len(batch), n=len(batch[0][1]))]
+    for item, (_, paragraphs) in enumerate(batch, start=1):
+        parts.append(format_item(item, paragraphs))
+    return "\n\n".join(parts)
+
+
+def parse_answer(text):
+    """
+    '1:err1:err2' -> {"flag": True, "errors": ["err1", "err2"]}, '0' -> {"flag": False, ...}
+    Anything else is not an answer and gets flag None, so it is neither taken as
+    "no error" nor cached.
+    """
+    lines = [line for line in text.strip().split("\n") if line.strip()]
+    if not lines:
+        return {"flag": None, "errors": [], "raw": text}
+    fields = lines[0].split(":")
+    flag = {"1": True, "0": False}.get(fields[0].strip())
+    return {"flag": flag, "errors": fields[1:] if flag else [], "raw": text}
+
+
+def parse_batch_answer(text, count):
+    # One 'ITEM:answer' line per item; items the model skipped get flag None
+    answers = {}
+    for line in text.strip().split("\n"):
+        match = BATCH_LINE_RE.match(line)
+        if match and 1 <= int(match.group(1)) <= count:
+            answers[int(match.group(1))] = parse_answer(match.group(2))
+    return [answers.get(item, {"flag": None, "errors": [], "raw": text}) for item in range(1, count + 1)]
+
+
+def estimate_tokens(text):
+    # About 4 characters per token, for models without a local tokenizer
+    return len(text) // 4 + 1
+
+
+# ----------------------
+# Model adapters
+# ----------------------
+# Every adapter has a name (part of the cache key of its verdicts), complete(prompt, items)
+# and count_tokens(text), the latter is used to pack the prompts up to a token budget
+class WatsonxModel:
+    """Adapter for the ibm_watsonx_ai ModelInference returned by setup_watsnox()."""
+    def __init__(self, model, params):
+        self.model = model
+        self.params = params
+        self.name = f"watsonx:{getattr(model, 'model_id', None)}"
+
+    def params_for(self, items):
+        # A batched answer spans several lines and needs room for every item
+        if items == 1:
+            return self.params
+        params = dict(self.params)
+        params["max_new_tokens"] = self.params.get("max_new_tokens", 16) * items
+        params["stop_sequences"] = [s for s in self.params.get("stop_sequences", []) if s != "\n"]
+        return params
+
+    async def complete(self, prompt, items=1):
+        result = await asyncio.to_thread(self.model.generate, prompt=prompt, params=self.params_for(items))
+        output = result["results"][0]
+        # watsonx reports the token counts with every generation
+        metrics.count("llm_prompt_tokens", output.get("input_token_count", 0))
+        metrics.count("llm_completion_tokens", output.get("generated_token_count", 0))
+        return output["generated_text"]
+
+    def count_tokens(self, text):
+        # The tokenizer of the hosted model is only reachable through the API
+        return estimate_tokens(text)
+
+
+class GeminiModel:
+    """Adapter for scratch_files.gemini.Gemini."""
+    def __init__(self, gemini):
+        self.gemini = gemini
+        self.name = f"gemini:{getattr(gemini.model, 'model_name', None)}"
+
+    async def complete(self, prompt, items=1):
+        response = await asyncio.to_thread(self.gemini.prompt, prompt)
+        if metrics.is_enabled():
+            # Counted like the packer budget, not with the json quoting of calc_token_count
+            metrics.count("llm_prompt_tokens", self.count_tokens(prompt))
+            metrics.count("llm_completion_tokens", self.count_tokens(response.text))
+        return response.text
+
+    def count_tokens(self, text):
+        return self.gemini.count_tokens(text)
+
+
+class FakeModel:
+    """
+    Offline stand-in for a model: answer(prompt) gives the text, latency simulates the
+    round trip and failure_rate makes calls raise, to exercise the retries.
+    """
+    def __init__(self, answer=None, latency=0.05, failure_rate=0.0, seed=0):
+        self.answer = answer or (lambda prompt: "0")
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.name = "fake"
+
+    async def complete(self, prompt, items=1):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.random.random() < self.failure_rate:
+            raise ConnectionError("fake model failure")
+        text = self.answer(prompt)
+        # A one line answer (like "1:unchecked", which also parses as item 1) is given for every item
+        if items > 1 and "\n" not in text.strip():
+            text = "\n".join(f"{item}:{text}" for item in range(1, items + 1))
+        return text
+
+    def count_tokens(self, text):
+        return estimate_tokens(text)
+
+
+# ----------------------
+# Rate limiting
+# ----------------------
+class TokenBucket:
+    """Allows `rate` requests per second on average with bursts of up to `capacity`."""
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# ----------------------
+# Packing
+# ----------------------
+class ChunkPacker:
+    """
+    Packs paragraph tuples into batch prompts of at most `budget` prompt tokens.
+    Every tuple is tokenized once (cached by its text, so a tuple sent again in a later
+    document isn't re-encoded) and costs its tokens plus its item number and separator
+    in the prompt it is placed in; every prompt starts with the instructions (header).
+    First fit decreasing: the largest tuples go first into the first prompt with room
+    left, which leaves fewer and fuller prompts than cutting the list every
+    batch_size items. Inside a prompt the tuples keep their document order.
+    A tuple larger than the budget on its own is sent alone.
+    max_items caps the tuples per prompt, the answer needs a line for each of them.
+    """
+    # Items are counted with a three digit number and the blank line joining them to the prompt
+    ITEM_NUMBER = 100
+
+    def __init__(self, count_tokens, budget, max_items=None, cache_size=100_000):
+        self.count_tokens = count_tokens
+        self.budget = budget
+        self.max_items = max_items
+        self.cache_size = cache_size
+        self.cache = {}
+        self.hits = 0
+
+    def item_tokens(self, paragraphs):
+        key = tuple(str(p) for p in paragraphs)
+        tokens = self.cache.get(key)
+        if tokens is not None:
+            self.hits += 1
+            return tokens
+        tokens = self.count_tokens("\n\n" + format_item(self.ITEM_NUMBER, key))
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+        self.cache[key] = tokens
+        return tokens
+
+    def header(self, n, count):
+        # The instructions of a prompt with up to count items of n paragraphs
+        return self.count_tokens(BATCH_PROMPT.format(count=count, n=n))
+
+    def pack(self, items):
+        """
+        items = [(key, (para_lang1, para_lang2, ...))]
+        Returns batches for LLMStage: [[(key, paragraphs), ...], ...]
+        """
+        items = list(items)
+        if not items:
+            return []
+        sizes = [self.item_tokens(paragraphs) for _, paragraphs in items]
+        capacity = self.budget - self.header(len(items[0][1]), self.max_items or len(items))
+        bins, room = [], []
+        for index in sorted(range(len(items)), key=lambda i: -sizes[i]):
+            for b, left in enumerate(room):
+                if sizes[index] <= left and (self.max_items is None or len(bins[b]) < self.max_items):
+                    bins[b].append(index)
+                    room[b] -= sizes[index]
+                    break
+            else:
+                bins.append([index])
+                room.append(capacity - sizes[index])
+        metrics.count("llm_packed_items", len(items))
+        metrics.count("llm_packed_prompts", len(bins))
+        return [[items[i] for i in indexes] for indexes in sorted(sorted(b) for b in bins)]
+
+    def stats(self):
+        return {"cached": len(self.cache), "hits": self.hits}
+
+
+# ----------------------
+# Stage
+# ----------------------
+class LLMStage:
+    """
+    Sends paragraph tuples to the model concurrently.
+    - concurrency: max requests in flight (semaphore)
+    - rate / burst: token bucket in requests per second, None for no limit
+    - max_retries / backoff: exponential backoff with jitter on failures
+    - batch_size: paragraph tuples per prompt
+    - token_budget: pack the tuples into prompts of up to this many tokens instead
+      (ChunkPacker), batch_size then caps the tuples per prompt when it's above 1
+    - cache: ResultCache for the verdicts, keyed on (model name, PROMPT_VERSION,
+      paragraph tuple); cached tuples aren't sent again, failed calls aren't cached
+    items = [(key, (para_lang1, para_lang2, ...))], results come back as {key: answer}.
+    """
+    def __init__(self, model, concurrency=8, rate=None, burst=None, max_retries=3, backoff=1.0, batch_size=1,
+                 token_budget=None, cache=None):
+        self.model = model
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.batch_size = max(1, batch_size)
+        self.packer = None
+        if token_budget:
+            self.packer = ChunkPacker(model.count_tokens, token_budget,
+                                      max_items=self.batch_size if self.batch_size > 1 else None)
+        self.cache = cache
+        self.cached = 0
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+
+    async def _call(self, prompt, items, semaphore, bucket):
+        for attempt in range(self.max_retries + 1):
+            if bucket is not None:
+                await bucket.acquire()
+            async with semaphore:
+                try:
+                    self.calls += 1
+                    metrics.count("llm_requests")
+                    with metrics.timer("llm_request"):
+                        return await self.model.complete(prompt, items=items)
+                except Exception:
+                    if attempt == self.max_retries:
+                        self.failures += 1
+                        metrics.count("llm_failures")
+                        raise
+            self.retries += 1
+            metrics.count("llm_retries")
+            await asyncio.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
+
+    async def _check_batch(self, batch, semaphore, bucket):
+        try:
+            if len(batch) == 1:
+                text = await self._call(build_prompt(batch[0][1]), 1, semaphore, bucket)
+                answers = [parse_answer(text)]
+            else:
+                text = await self._call(build_batch_prompt(batch), len(batch), semaphore, bucket)
+                answers = parse_batch_answer(text, len(batch))
+        except Exception as e:
+            # One dict per item, a later stage may update an answer in place
+            answers = [{"flag": None, "errors": [], "raw": None, "error": repr(e)} for _ in batch]
+        return [(key, answer) for (key, _), answer in zip(batch, answers)]
+
+    def verdict_key(self, paragraphs):
+        return content_key("llm", self.model.name, PROMPT_VERSION, [str(p) for p in paragraphs])
+
+    async def check_all(self, items):
+        items = list(items)
+        results = {}
+        if self.cache is not None:
+            keys = {key: self.verdict_key(paragraphs) for key, paragraphs in items}
+            for key, _ in items:
+                answer = self.cache.get(keys[key])
+                if answer is not None:
+                    results[key] = answer
+            self.cached += len(results)
+            metrics.count("llm_cached", len(results))
+            items = [item for item in items if item[0] not in results]
+        semaphore = asyncio.Semaphore(self.concurrency)
+        bucket = TokenBucket(self.rate, self.burst) if self.rate else None
+        if self.packer is not None:
+            batches = self.packer.pack(items)
+        else:
+            batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        done = await asyncio.gather(*(self._check_batch(b, semaphore, bucket) for b in batches))
+        for batch in done:
+            for key, answer in batch:
+                results[key] = answer
+                # What used to be printed per answer: flagged, clean or no usable answer
+                metrics.count(VERDICT_METRICS[answer["flag"]])
+                if self.cache is not None and answer["flag"] is not None:
+                    self.cache.put(keys[key], answer)
+        if self.cache is not None:
+            self.cache.flush()
+        return results
+
+    def run(self, items):
+        return asyncio.run(self.check_all(items))
+
+    def stats(self):
+        stats = {"calls": self.calls, "retries": self.retries, "failures": self.failures}
+        if self.cache is not None:
+            stats["cached"] = self.cached
+        if self.packer is not None:
+            stats["packer"] = self.packer.stats()
+        return stats
+
+
+if "__main__" == __name__:
+    # Offline run against the fake model
+    items = [(i, (f"EUR {i}", f"{i} EUR", f"{i} euro")) for i in range(20)]
+    model = FakeModel(answer=lambda prompt: "1:EUR 7 vs 8" if "EUR 7" in prompt else "0",
+                      latency=0.2, failure_rate=0.3, seed=1)
+    stage = LLMStage(model, concurrency=5, rate=20, max_retries=5, backoff=0.05, batch_size=1)
+    start = time.perf_counter()
+    results = stage.run(items)
+    print(f"{len(results)} items in {time.perf_counter() - start:.2f}s, {stage.stats()}")
+    print({k: v for k, v in results.items() if v["flag"]})
+
+    stage = LLMStage(FakeModel(answer=lambda prompt: "0", latency=0.2), concurrency=5, token_budget=400)
+    start = time.perf_counter()
+    results = stage.run(items)
+    print(f"packed: {len(results)} items in {time.perf_counter() - start:.2f}s, {stage.stats()}")
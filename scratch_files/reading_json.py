@@ -1,15 +1,19 @@
 import json
+import logging
 import os
 from pathlib import Path
 from ibm_watsonx_ai.foundation_models import ModelInference
 import pandas as pd
 from ibm_watsonx_ai import Credentials, APIClient
 from dotenv import load_dotenv, find_dotenv
-import re
 from collections import Counter
 
-
+import metrics
 from scratch_files.gemini import Gemini
+from scratch_files.currency import count_currencies
+from scratch_files.llm_stage import LLMStage, WatsonxModel
+
+log = logging.getLogger(__name__)
 
 # parameters = {
 #     "decoding_method": "greedy",
@@ -48,240 +52,6 @@ parameters = {
     }
 }
 
-currency_symbols = [
-    "$",   # Dollar (USD, CAD, AUD, etc.)
-    "€",   # Euro
-    "¥",   # Yen/Yuan
-    "£",   # Pound
-    "₣",   # Franc (historic, still used in some)
-    "₩",   # South Korean Won
-    "₹",   # Indian Rupee
-    "₽",   # Russian Ruble
-    "R$",  # Brazilian Real
-    "R",   # South African Rand
-    "₺",   # Turkish Lira
-    "₪",   # Israeli Shekel
-    "﷼",   # Generic Rial/Riyal (SAR, QAR, OMR, IRR, YER)
-    "د.إ", # UAE Dirham
-    "₱",   # Philippine Peso
-    "₫",   # Vietnamese Dong
-    "₦",   # Nigerian Naira
-    "د.ج", # Algerian Dinar
-    "د.ك", # Kuwaiti Dinar
-    "ج.م", # Egyptian Pound
-    "د.ت", # Tunisian Dinar
-    "ر.ق", # Qatari Riyal
-    "د.ب", # Bahraini Dinar
-    "ل.ل", # Lebanese Pound
-    "฿",   # Thai Baht
-    "₭",   # Lao Kip
-    "₮",   # Mongolian Tögrög
-    "₴",   # Ukrainian Hryvnia
-    "лв",  # Bulgarian Lev
-    "Ft",  # Hungarian Forint
-    "zł",  # Polish Zloty
-    "kr",  # Nordic Krona/Krone (SEK, NOK, DKK, ISK)
-    "Kč",  # Czech Koruna
-    "lei", # Romanian Leu
-    "DH",  # Moroccan Dirham (common abbreviation)
-    "₲",   # Paraguayan Guaraní
-    "₡",   # Costa Rican Colón
-    "₵",   # Ghanaian Cedi
-    "₸",   # Kazakhstani Tenge
-    "₼",   # Azerbaijani Manat
-    "ман", # Turkmenistani Manat
-    "ден", # Macedonian Denar
-    "؋",   # Afghan Afghani
-    "Br",  # Ethiopian Birr / Belarusian Ruble
-    "₨",   # Generic Rupee (Sri Lanka, Nepal, Pakistan, etc.)
-]
-
-
-currency_codes = [
-    "AED", "AFN", "ALL", "AMD", "ANG", "AOA", "ARS", "AUD", "AWG", "AZN",
-    "BAM", "BBD", "BDT", "BGN", "BHD", "BIF", "BMD", "BND", "BOB", "BRL",
-    "BSD", "BTN", "BWP", "BYN", "BZD", "CAD", "CDF", "CHF", "CLP", "CNY",
-    "COP", "CRC", "CUP", "CVE", "CZK", "DJF", "DKK", "DOP", "DZD", "EGP",
-    "ERN", "ETB", "EUR", "FJD", "FKP", "FOK", "GBP", "GEL", "GGP", "GHS",
-    "GIP", "GMD", "GNF", "GTQ", "GYD", "HKD", "HNL", "HRK", "HTG", "HUF",
-    "IDR", "ILS", "IMP", "INR", "IQD", "IRR", "ISK", "JEP", "JMD", "JOD",
-    "JPY", "KES", "KGS", "KHR", "KID", "KMF", "KRW", "KWD", "KYD", "KZT",
-    "LAK", "LBP", "LKR", "LRD", "LSL", "LYD", "MAD", "MDL", "MGA", "MKD",
-    "MMK", "MNT", "MOP", "MRU", "MUR", "MVR", "MWK", "MXN", "MYR", "MZN",
-    "NAD", "NGN", "NIO", "NOK", "NPR", "NZD", "OMR", "PAB", "PEN", "PGK",
-    "PHP", "PKR", "PLN", "PYG", "QAR", "RON", "RSD", "RUB", "RWF", "SAR",
-    "SBD", "SCR", "SDG", "SEK", "SGD", "SHP", "SLE", "SOS", "SRD", "SSP",
-    "STN", "SYP", "SZL", "THB", "TJS", "TMT", "TND", "TOP", "TRY", "TTD",
-    "TVD", "TWD", "TZS", "UAH", "UGX", "USD", "UYU", "UZS", "VES", "VND",
-    "VUV", "WST", "XAF", "XCD", "XOF", "XPF", "YER", "ZAR", "ZMW", "ZWL"
-]
-
-
-currency_names = [
-    "united arab emirates dirham",
-    "afghan afghani",
-    "albanian lek",
-    "armenian dram",
-    "netherlands antillean guilder",
-    "angolan kwanza",
-    "argentine peso",
-    "australian dollar",
-    "aruban florin",
-    "azerbaijani manat",
-    "bosnia and herzegovina convertible mark",
-    "barbados dollar",
-    "bangladeshi taka",
-    "bulgarian lev",
-    "bahraini dinar",
-    "burundian franc",
-    "bermudian dollar",
-    "brunei dollar",
-    "bolivian boliviano",
-    "brazilian real",
-    "bahamian dollar",
-    "bhutanese ngultrum",
-    "botswana pula",
-    "belarusian ruble",
-    "belize dollar",
-    "canadian dollar",
-    "congolese franc",
-    "swiss franc",
-    "chilean peso",
-    "chinese yuan renminbi",
-    "colombian peso",
-    "costa rican colón",
-    "cuban peso",
-    "cape verdean escudo",
-    "czech koruna",
-    "djiboutian franc",
-    "danish krone",
-    "dominican peso",
-    "algerian dinar",
-    "egyptian pound",
-    "eritrean nakfa",
-    "ethiopian birr",
-    "euro",
-    "fiji dollar",
-    "falkland islands pound",
-    "faroese krona",
-    "pound sterling",
-    "georgian lari",
-    "guernsey pound",
-    "ghanaian cedi",
-    "gibraltar pound",
-    "gambian dalasi",
-    "guinean franc",
-    "guatemalan quetzal",
-    "guyana dollar",
-    "hong kong dollar",
-    "honduran lempira",
-    "croatian kuna",     # replaced by euro in 2023, still ISO
-    "haitian gourde",
-    "hungarian forint",
-    "indonesian rupiah",
-    "israeli new shekel",
-    "jersey pound",
-    "indian rupee",
-    "iraqi dinar",
-    "iranian rial",
-    "icelandic krona",
-    "jersey pound",
-    "jamaican dollar",
-    "jordanian dinar",
-    "japanese yen",
-    "kenyan shilling",
-    "kyrgyzstani som",
-    "cambodian riel",
-    "kiribati dollar",
-    "comorian franc",
-    "south korean won",
-    "kuwaiti dinar",
-    "cayman islands dollar",
-    "kazakhstani tenge",
-    "lao kip",
-    "lebanese pound",
-    "sri lanka rupee",
-    "liberian dollar",
-    "lesotho loti",
-    "libyan dinar",
-    "moroccan dirham",
-    "moldovan leu",
-    "malagasy ariary",
-    "macedonian denar",
-    "myanmar kyat",
-    "mongolian tögrög",
-    "macanese pataca",
-    "mauritanian ouguiya",
-    "mauritian rupee",
-    "maldivian rufiyaa",
-    "malawian kwacha",
-    "mexican peso",
-    "malaysian ringgit",
-    "mozambican metical",
-    "namibian dollar",
-    "nigerian naira",
-    "nicaraguan córdoba",
-    "norwegian krone",
-    "nepalese rupee",
-    "new zealand dollar",
-    "omani rial",
-    "panamanian balboa",
-    "peruvian sol",
-    "papua new guinea kina",
-    "philippine peso",
-    "pakistani rupee",
-    "polish złoty",
-    "paraguayan guaraní",
-    "qatari riyal",
-    "romanian leu",
-    "serbian dinar",
-    "russian ruble",
-    "rwandan franc",
-    "saudi riyal",
-    "solomon islands dollar",
-    "seychelles rupee",
-    "sudanese pound",
-    "swedish krona",
-    "singapore dollar",
-    "saint helena pound",
-    "sierra leonean leone",
-    "somali shilling",
-    "surinamese dollar",
-    "south sudanese pound",
-    "são tomé and príncipe dobra",
-    "syrian pound",
-    "eswatini lilangeni",
-    "thai baht",
-    "tajikistani somoni",
-    "turkmenistani manat",
-    "tunisian dinar",
-    "tongan paʻanga",
-    "turkish lira",
-    "trinidad and tobago dollar",
-    "tuvaluan dollar",
-    "new taiwan dollar",
-    "tanzanian shilling",
-    "ukrainian hryvnia",
-    "ugandan shilling",
-    "united states dollar",
-    "uruguayan peso",
-    "uzbekistani som",
-    "venezuelan bolívar",
-    "vietnamese đồng",
-    "vanuatu vatu",
-    "samoan tālā",
-    "central african cfa franc",
-    "east caribbean dollar",
-    "west african cfa franc",
-    "cfp franc",
-    "yemeni rial",
-    "south african rand",
-    "zambian kwacha",
-    "zimbabwean dollar"
-]
-
-
-
 def setup_watsnox():
     loaded = load_dotenv(find_dotenv(), override=True)
     api_key = os.getenv("api_key")
@@ -361,44 +131,48 @@ def find_errors(LLM, para):
     #prompt = ("Is in this paragraph some kinde of mention of valuta? Only answer with Yes or No")
 
 
-    result = LLM.generate(prompt=prompt,params=parameters)
-    print(result)
-    text = result["results"][0]["generated_text"].strip()
+    metrics.count("llm_requests")
+    with metrics.timer("llm_request"):
+        result = LLM.generate(prompt=prompt,params=parameters)
+    output = result["results"][0]
+    metrics.count("llm_prompt_tokens", output.get("input_token_count", 0))
+    metrics.count("llm_completion_tokens", output.get("generated_token_count", 0))
+    text = output["generated_text"].strip()
     results = text.split("\n")
     results = [r for r in results if r.strip()]
 
     return results
 
-def parse_entire_text(data, LLM):
+def parse_entire_text(data, LLM, concurrency=8, rate=None, batch_size=1, cache=None):
+    """
+    Checks every paragraph tuple with the LLM. The requests run concurrently
+    (see scratch_files/llm_stage.py): at most `concurrency` in flight, `rate`
+    requests per second and `batch_size` paragraph tuples per prompt.
+    cache = ResultCache for the verdicts, tuples checked before aren't sent again.
+    """
     paragraphs = len(data[0])
     df = pd.DataFrame(index=pd.Index([], dtype="Int64", name="para_number"),
                        columns=["flag", "errors"])
     df["flag"] = df["flag"].astype("boolean")
 
+    items = []
     for index in range(1, paragraphs):
-        para_en = data[0].loc[index]["para"]
-        para_de = data[1].loc[index]["para"]
-        para_lv = data[2].loc[index]["para"]
-
-        para = (para_en, para_de, para_lv)
-
-        result = find_errors(LLM, para)
-        if result is not None:
-            results = result[0].split(":")
-            #extra_info = results[1]
-
-            print(results)
+        para = tuple(language.loc[index]["para"] for language in data)
+        items.append((index, para))
+
+    stage = LLMStage(WatsonxModel(LLM, parameters), concurrency=concurrency, rate=rate, batch_size=batch_size,
+                     cache=cache)
+    for index, answer in stage.run(items).items():
+        log.debug("paragraph %s: %r", index, answer["raw"])
+        if answer["flag"]:
             df.at[index, "flag"] = True
-            if results[0] == "1":
-                results.pop(0)
-                print(results)
-                df.at[index,"flag"] = True
-                df.at[index,"errors"] = results
-
-            else:
-                df.loc[index, "flag"] = False
+            df.at[index, "errors"] = answer["errors"]
+        elif answer["flag"] is not None:
+            df.loc[index, "flag"] = False
+    log.info("llm stage: %s", stage.stats())
     return df
 
+@metrics.timed("valuta_counter")
 def valuta_counter(data):
     counts = Counter()
     paragraphs = len(data[0])
@@ -407,21 +181,9 @@ def valuta_counter(data):
             para_language = language.loc[index]["para"]
             print(para_language+"\n")
 
-            for sym in currency_symbols:
-                if sym in para_language:
-                    counts[sym] = para_language.count(sym)
-
-                # Abbreviations (whole word, case-sensitive like USD/EUR)
-            for code in currency_codes:
-                matches = re.findall(rf"\b{re.escape(code)}\b", para_language)
-                if matches:
-                    counts[code] = len(matches)
-
-                # Full names (whole phrase, case-insensitive)
-            for name in currency_names:
-                matches = re.findall(rf"\b{name}\b", para_language, flags=re.IGNORECASE)
-                if matches:
-                    counts[name] = len(matches)
+            # Symbols, ISO codes (case-sensitive) and full names (case-insensitive) in one scan
+            for key, n in count_currencies(para_language).items():
+                counts[key] = n
 
     return counts
 
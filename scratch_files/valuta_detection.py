@@ -1,27 +1,10 @@
 import json
-import re
 from pathlib import Path
 
 import pandas as pd
 
-currency_codes = [
-    "AED", "AFN", "ALL", "AMD", "ANG", "AOA", "ARS", "AUD", "AWG", "AZN",
-    "BAM", "BBD", "BDT", "BGN", "BHD", "BIF", "BMD", "BND", "BOB", "BRL",
-    "BSD", "BTN", "BWP", "BYN", "BZD", "CAD", "CDF", "CHF", "CLP", "CNY",
-    "COP", "CRC", "CUP", "CVE", "CZK", "DJF", "DKK", "DOP", "DZD", "EGP",
-    "ERN", "ETB", "EUR", "FJD", "FKP", "FOK", "GBP", "GEL", "GGP", "GHS",
-    "GIP", "GMD", "GNF", "GTQ", "GYD", "HKD", "HNL", "HRK", "HTG", "HUF",
-    "IDR", "ILS", "IMP", "INR", "IQD", "IRR", "ISK", "JEP", "JMD", "JOD",
-    "JPY", "KES", "KGS", "KHR", "KID", "KMF", "KRW", "KWD", "KYD", "KZT",
-    "LAK", "LBP", "LKR", "LRD", "LSL", "LYD", "MAD", "MDL", "MGA", "MKD",
-    "MMK", "MNT", "MOP", "MRU", "MUR", "MVR", "MWK", "MXN", "MYR", "MZN",
-    "NAD", "NGN", "NIO", "NOK", "NPR", "NZD", "OMR", "PAB", "PEN", "PGK",
-    "PHP", "PKR", "PLN", "PYG", "QAR", "RON", "RSD", "RUB", "RWF", "SAR",
-    "SBD", "SCR", "SDG", "SEK", "SGD", "SHP", "SLE", "SOS", "SRD", "SSP",
-    "STN", "SYP", "SZL", "THB", "TJS", "TMT", "TND", "TOP", "TRY", "TTD",
-    "TVD", "TWD", "TZS", "UAH", "UGX", "USD", "UYU", "UZS", "VES", "VND",
-    "VUV", "WST", "XAF", "XCD", "XOF", "XPF", "YER", "ZAR", "ZMW", "ZWL"
-]
+from scratch_files.currency import currency_codes, count_currencies
+
 
 
 def load_json_test_samples(new=False):
@@ -70,51 +53,55 @@ def make_paragraph_df(data):
 
 LANGS = ["en", "de", "lv"]
 
-def _count_codes(text: str, codes: list[str]) -> dict[str, int]:
-    """Count ISO currency codes as whole words (case-sensitive)."""
-    out = {}
-    for code in codes:
-        n = len(re.findall(rf"\b{re.escape(code)}\b", text))
-        if n:
-            out[code] = n
-    return out
-
-def compare_currency_counts(dfs: list[pd.DataFrame], codes: list[str]) -> pd.DataFrame:
+def currency_count_frame(df: pd.DataFrame, lang: str, codes: list[str]) -> pd.DataFrame:
+    """
+    One pass over the paragraphs of one language.
+    Returns a long DF with columns: para_number, lang, code, count (only counts > 0)
     """
-    dfs = [en_df, de_df, lv_df] (all indexed by para_number and with column 'para')
+    wanted = set(codes)
+    records = [
+        (para_number, code, count)
+        for para_number, text in zip(df.index, df["para"])
+        for code, count in count_currencies(text, kinds=("code",)).items()
+        if code in wanted
+    ]
+    long = pd.DataFrame(records, columns=["para_number", "code", "count"])
+    long.insert(1, "lang", lang)
+    return long
+
+def compare_currency_counts(dfs: list[pd.DataFrame], codes: list[str], langs: list[str] = LANGS) -> pd.DataFrame:
+    """
+    dfs = [en_df, de_df, lv_df] (all indexed by para_number and with column 'para'),
+    one DF per language in langs
     Returns a DF with columns:
       - para_number
       - has_mismatch (bool)
       - mismatches (dict: {code: {'en': x, 'de': y, 'lv': z}})
+    Paragraphs that share a para_number within one language are counted together.
     """
-    common_idx = dfs[0].index.intersection(dfs[1].index).intersection(dfs[2].index)
-    rows = []
-
-    for i in common_idx:
-        texts = {
-            "en": dfs[0].loc[i, "para"],
-            "de": dfs[1].loc[i, "para"],
-            "lv": dfs[2].loc[i, "para"],
-        }
-
-        counts = {lang: _count_codes(texts[lang], codes) for lang in LANGS}
-        codes_here = set().union(*[set(d.keys()) for d in counts.values()])
-
-        mismatches = {}
-        for code in sorted(codes_here):
-            triple = (counts["en"].get(code, 0),
-                      counts["de"].get(code, 0),
-                      counts["lv"].get(code, 0))
-            if not (triple[0] == triple[1] == triple[2]):
-                mismatches[code] = {"en": triple[0], "de": triple[1], "lv": triple[2]}
-
-        rows.append({
-            "para_number": i,
-            "has_mismatch": bool(mismatches),
-            "mismatches": mismatches
-        })
-
-    out = pd.DataFrame(rows).set_index("para_number")
+    common_idx = dfs[0].index.unique()
+    for df in dfs[1:]:
+        common_idx = common_idx.intersection(df.index.unique())
+
+    # (para_number, code) x lang count matrix
+    long = pd.concat([currency_count_frame(df, lang, codes) for df, lang in zip(dfs, langs)])
+    long = long[long["para_number"].isin(common_idx)]
+    wide = (
+        long.pivot_table(index=["para_number", "code"], columns="lang", values="count", aggfunc="sum", fill_value=0)
+        .reindex(columns=list(langs), fill_value=0)
+        .astype(int)
+    )
+    wide = wide[wide.max(axis=1) != wide.min(axis=1)]
+
+    mismatches = {i: {} for i in common_idx}
+    for (i, code), counts in zip(wide.index, wide.to_dict("records")):
+        mismatches[i][code] = counts
+
+    out = pd.DataFrame({
+        "para_number": common_idx,
+        "has_mismatch": common_idx.isin(wide.index.get_level_values("para_number")),
+        "mismatches": [mismatches[i] for i in common_idx],
+    }).set_index("para_number")
     return out
 
 import matplotlib.pyplot as plt
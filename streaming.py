@@ -0,0 +1,159 @@
+import json
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+
+from docx_ingest import iter_docx_paragraphs
+
+try:
+    import ijson
+except ImportError:  # optional, without it a .json file is read one document at a time
+    ijson = None
+
+CHUNK_SIZE = 1 << 20
+
+
+# ----------------------
+# Readers
+# ----------------------
+def iter_array_items(f, chunk_size=CHUNK_SIZE):
+    """
+    Yields the elements of the top-level json array in the text file f one by one,
+    only one element is held in memory at a time. Raises json.JSONDecodeError when
+    the input ends before the closing bracket.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    started = False
+    while True:
+        # Skip the opening bracket and the separators between elements
+        while pos < len(buffer) and (buffer[pos] in " \t\r\n," or (buffer[pos] == "[" and not started)):
+            started = started or buffer[pos] == "["
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        if pos < len(buffer):
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                # An element running up to the end of the buffer may continue in the next chunk
+                if end < len(buffer):
+                    yield item
+                    buffer, pos = buffer[end:], 0
+                    continue
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+        if eof:
+            # The input ended before the closing bracket: it was truncated
+            raise json.JSONDecodeError("Expecting ',' delimiter or ']'" if started else "Expecting value",
+                                       buffer, len(buffer))
+        # Read at least as much as is buffered, so a large element is re-parsed only a few times
+        data = f.read(max(chunk_size, len(buffer)))
+        eof = not data
+        buffer = buffer[pos:] + data
+        pos = 0
+
+
+def _ijson_paragraphs(f):
+    # Paragraph level events, a document is never built in full. The paragraphs
+    # of a document whose "file" comes after "para" are held until it is read
+    events = ijson.parse(f)
+    doc_num = -1
+    for prefix, event, value in events:
+        if prefix == "item" and event == "start_map":
+            doc_num += 1
+            file, has_file, pending = None, False, []
+        elif prefix == "item" and event == "end_map":
+            for paragraph in pending:
+                yield doc_num, file, paragraph
+        elif prefix == "item.file":
+            file, has_file = value, True
+        elif prefix == "item.para.item" and event == "start_map":
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            depth = 1
+            while depth:
+                _, event, value = next(events)
+                builder.event(event, value)
+                depth += (event == "start_map") - (event == "end_map")
+            if has_file:
+                yield doc_num, file, builder.value
+            else:
+                pending.append(builder.value)
+
+
+def _jsonl_paragraphs(f):
+    # Records written by to_jsonl carry their document number; without one a new
+    # document starts where the file name changes
+    doc_num = -1
+    last = object()
+    for line in f:
+        if line.strip():
+            record = json.loads(line)
+            file = record.pop("file", None)
+            if "doc" in record:
+                doc_num = record.pop("doc")
+            elif file != last:
+                doc_num += 1
+            last = file
+            yield doc_num, file, record
+
+
+def iter_paragraphs(path):
+    """
+    Yields (doc_num, file, {"para": str, "para_number": int}) from one language file,
+    doc_num is the position of the document in the file:
+    - .jsonl: one {"doc", "file", "para", "para_number"} record per line
+    - .json:  the parsed format [{"file": ..., "para": [...]}, ...], streamed
+      paragraph by paragraph with ijson when installed, else document by document
+    - .docx:  read directly, see docx_ingest.py
+    A document without paragraphs yields nothing, its number is skipped.
+    """
+    if str(path).endswith(".docx"):
+        name = Path(path).name
+        for paragraph in iter_docx_paragraphs(path):
+            yield 0, name, paragraph
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        if str(path).endswith(".jsonl"):
+            yield from _jsonl_paragraphs(f)
+        elif ijson is not None:
+            yield from _ijson_paragraphs(f)
+        else:
+            for doc_num, doc in enumerate(iter_array_items(f)):
+                for paragraph in doc.get("para", []):
+                    yield doc_num, doc.get("file"), paragraph
+
+
+def iter_aligned(paths):
+    """
+    paths = {lang: file}, documents are paired by position across the files and
+    paragraphs by position within a document, like load_documents.
+    Yields (file of the first language, par_num, {lang: paragraph}) lazily.
+    """
+    languages = list(paths)
+    # Grouped by document number, not by name: names may repeat or be missing
+    per_lang = [groupby(iter_paragraphs(paths[lang]), key=itemgetter(0, 1)) for lang in languages]
+    heads = [next(docs, None) for docs in per_lang]
+    while all(head is not None for head in heads):
+        doc_num = min(key[0] for key, _ in heads)
+        if all(key[0] == doc_num for key, _ in heads):
+            name = heads[0][0][1]
+            columns = [(paragraph for _, _, paragraph in group) for _, group in heads]
+            for par_num, row in enumerate(zip(*columns)):
+                yield name, par_num, dict(zip(languages, row))
+        # A document that is empty in another language has no rows
+        heads = [next(docs, None) if key[0] == doc_num else (key, group)
+                 for docs, (key, group) in zip(per_lang, heads)]
+
+
+def to_jsonl(path, out_path):
+    """Rewrite a parsed .json file as JSON Lines, one paragraph per line."""
+    count = 0
+    with open(out_path, 'w', encoding='utf-8') as out:
+        for doc_num, file, paragraph in iter_paragraphs(path):
+            out.write(json.dumps({"doc": doc_num, "file": file, **paragraph}, ensure_ascii=False) + "\n")
+            count += 1
+    return count
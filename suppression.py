@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from main_v2 import filter_acronyms
+
+# A pair found in this many different documents is a known benign mismatch
+MIN_DOCUMENTS = 3
+# Document ids kept per pair; once a pair is known more don't change anything
+MAX_DOCUMENT_IDS = 8
+
+
+def document_id(name):
+    return hashlib.sha256(str(name).encode("utf-8")).hexdigest()[:12]
+
+
+class SuppressionList:
+    """
+    Acronym pairs (lang_a, lang_b, token_a, token_b) that keep coming back across
+    runs, like EU / ES or AND / UND, learned from the findings instead of kept by hand.
+    Every run records the pairs of its findings; save() merges them into a json
+    frequency table on disk (paragraph count and the ids of the documents the pair
+    was found in). Pairs seen in min_documents different documents are loaded into
+    a set and filtered out of the results before they are highlighted, reported or
+    escalated; a typo is a one-off and rarely comes back in other documents.
+    Numeric pairs aren't learned: a pair like 2 / 3 recurs by chance and can be a real error.
+        suppression = SuppressionList("suppression.json")
+        result = suppression.suppress(result, "en", "lv", paragraph_en, paragraph_lv)
+        suppression.record(finding)
+        suppression.save()
+    """
+    def __init__(self, path, min_documents=MIN_DOCUMENTS):
+        self.path = Path(path)
+        self.min_documents = min(min_documents, MAX_DOCUMENT_IDS)
+        self.runs = 0
+        self.pairs = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.runs = data["runs"]
+            for lang_a, lang_b, token_a, token_b, count, documents in data["pairs"]:
+                self.pairs[(lang_a, lang_b, token_a, token_b)] = [count, documents]
+        self.known = {key for key, (_, documents) in self.pairs.items() if len(documents) >= self.min_documents}
+        self.recorded = 0
+        self.suppressed = 0
+
+    def is_known(self, lang_a, lang_b, token_a, token_b):
+        return (lang_a, lang_b, token_a, token_b) in self.known
+
+    def suppress(self, result, lang_a, lang_b, paragraph_a, paragraph_b):
+        """
+        Returns result without the known acronym pairs, as a new dict; result itself
+        when none of its pairs is known.
+        """
+        if not self.known:
+            return result
+
+        def keep(token_a, token_b):
+            return (lang_a, lang_b, token_a, token_b) not in self.known
+
+        dropped = sum(not keep(*pair) for pair in result["acronyms"])
+        if not dropped:
+            return result
+        self.suppressed += dropped
+        return filter_acronyms(result, paragraph_a, paragraph_b, keep)
+
+    def record(self, finding):
+        # Counts every acronym pair of a finding, once per paragraph
+        doc = document_id(finding["file"])
+        for token_a, token_b in set(map(tuple, finding["acronyms"])):
+            entry = self.pairs.setdefault((finding["lang_a"], finding["lang_b"], token_a, token_b), [0, []])
+            entry[0] += 1
+            if doc not in entry[1] and len(entry[1]) < MAX_DOCUMENT_IDS:
+                entry[1].append(doc)
+            self.recorded += 1
+
+    def save(self):
+        """Writes the table with this run's pairs merged in, replacing the file atomically."""
+        self.runs += 1
+        data = {
+            "runs": self.runs,
+            "pairs": [[*key, count, documents] for key, (count, documents) in self.pairs.items()],
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def stats(self):
+        return {
+            "pairs": len(self.pairs),
+            "known": len(self.known),
+            "runs": self.runs,
+            "recorded": self.recorded,
+            "suppressed": self.suppressed,
+        }
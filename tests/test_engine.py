@@ -0,0 +1,20 @@
+from functools import partial
+
+import engine
+from paragraph_align import align_document
+
+
+def test_narrow_band_falls_back(monkeypatch, caplog):
+    document = {
+        "en": [{"para": f"Article {i}: EUR {i} 000 in 2021.", "para_number": i} for i in range(3)],
+        "de": [{"para": f"Artikel {i}: EUR {i} 000 im Jahr 2021.", "para_number": i} for i in range(2)],
+    }
+    # No alignment on the diagonal alone
+    monkeypatch.setattr(engine, "align_document", partial(align_document, band=0))
+    with engine.ConsistencyEngine(["en", "de"], align=True) as checker:
+        rows = checker.paragraph_rows(document, "a.docx")
+        checker.check_document(document, "a.docx")
+    # Every paragraph of both languages is in a row
+    for lang in document:
+        assert "".join(row[lang]["para"] for row in rows) == "".join(p["para"] for p in document[lang])
+    assert "a.docx" in caplog.text
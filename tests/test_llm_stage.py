@@ -0,0 +1,133 @@
+import re
+import time
+
+from scratch_files.llm_stage import FakeModel, LLMStage
+
+
+def items(n):
+    return [(i, (f"EUR {i}", f"{i} EUR", f"{i} euro")) for i in range(n)]
+
+
+class InFlightModel(FakeModel):
+    # Records the most requests that were waiting on the model at the same time
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.max_active = 0
+
+    async def complete(self, prompt, items=1):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            return await super().complete(prompt, items)
+        finally:
+            self.active -= 1
+
+
+class FlakyModel(FakeModel):
+    # Every prompt fails `failures` times before it is answered
+    def __init__(self, failures, **kwargs):
+        super().__init__(latency=0, **kwargs)
+        self.failures = failures
+        self.attempts = {}
+
+    async def complete(self, prompt, items=1):
+        self.attempts[prompt] = self.attempts.get(prompt, 0) + 1
+        if self.attempts[prompt] <= self.failures:
+            raise ConnectionError("flaky")
+        return await super().complete(prompt, items)
+
+
+def echo_items(prompt):
+    # Flags every item and names it by the number of its first paragraph
+    lines = [f"{item}:1:{number}" for item, number in re.findall(r"ITEM (\d+):\nEUR (\d+)", prompt)]
+    return "\n".join(lines) or "1:" + re.search(r"EUR (\d+)", prompt).group(1)
+
+
+def test_concurrency_cap():
+    model = InFlightModel(latency=0.02)
+    stage = LLMStage(model, concurrency=3)
+    results = stage.run(items(12))
+    assert len(results) == 12
+    assert model.max_active == 3
+    assert stage.stats()["calls"] == 12
+
+
+def test_rate_limit():
+    stage = LLMStage(FakeModel(latency=0), concurrency=10, rate=50, burst=1)
+    start = time.perf_counter()
+    stage.run(items(11))
+    # One request right away, the other ten 1/50 s apart
+    assert time.perf_counter() - start >= 0.18
+
+
+def test_retries():
+    stage = LLMStage(FlakyModel(failures=2), max_retries=3, backoff=0.001)
+    results = stage.run(items(5))
+    assert all(answer["flag"] is False for answer in results.values())
+    assert stage.stats() == {"calls": 15, "retries": 10, "failures": 0}
+
+
+def test_retries_exhausted():
+    stage = LLMStage(FlakyModel(failures=10), max_retries=2, backoff=0.001)
+    results = stage.run(items(2))
+    assert all(answer["flag"] is None and "error" in answer for answer in results.values())
+    assert stage.stats() == {"calls": 6, "retries": 4, "failures": 2}
+
+
+def test_batching_maps_answers_back():
+    model = FakeModel(answer=echo_items, latency=0)
+    stage = LLMStage(model, batch_size=4)
+    results = stage.run(items(10))
+    assert model.calls == 3
+    assert {key: answer["errors"] for key, answer in results.items()} == {i: [str(i)] for i in range(10)}
+
+
+def test_cached_verdicts_are_not_asked_again(tmp_path):
+    from result_cache import ResultCache
+
+    cache = ResultCache(tmp_path / "cache.sqlite")
+    answers = LLMStage(FakeModel(answer=echo_items, latency=0), cache=cache).run(items(4))
+    model = FakeModel(answer=echo_items, latency=0)
+    stage = LLMStage(model, cache=cache)
+    results = stage.run(items(6))
+    assert {key: results[key] for key in answers} == answers
+    assert model.calls == 2
+    assert stage.stats()["cached"] == 4
+    cache.close()
+
+
+def test_packer_fills_few_prompts():
+    from scratch_files.llm_stage import ChunkPacker, build_batch_prompt, estimate_tokens
+
+    packer = ChunkPacker(estimate_tokens, budget=2000)
+    batches = packer.pack(items(3000))
+    sizes = [estimate_tokens(build_batch_prompt(batch)) for batch in batches]
+    assert sorted(key for batch in batches for key, _ in batch) == list(range(3000))
+    assert max(sizes) <= 2000
+    # An item is about 10 tokens: about 190 of them fit a prompt
+    assert len(batches) <= 18
+    assert sum(size < 0.85 * 2000 for size in sizes) <= 1
+
+
+def test_packer_batches_map_back():
+    model = FakeModel(answer=echo_items, latency=0)
+    stage = LLMStage(model, token_budget=300, batch_size=10)
+    results = stage.run(items(50))
+    assert model.calls == 5
+    assert {key: answer["errors"] for key, answer in results.items()} == {i: [str(i)] for i in range(50)}
+
+
+def test_malformed_answer_keeps_the_finding():
+    from cascade import Cascade
+    from engine import ConsistencyEngine
+
+    document = {
+        "en": [{"para": "Revenue grew to EUR 120 million in 2021.", "para_number": 1}],
+        "de": [{"para": "Der Umsatz stieg 2021 auf EUR 150 Millionen.", "para_number": 1}],
+    }
+    stage = LLMStage(FakeModel(answer=lambda prompt: "I cannot tell", latency=0))
+    with ConsistencyEngine(["en", "de"]) as engine:
+        records = Cascade(engine, llm_stage=stage).run(document)
+    assert [record["decided_by"] for record in records] == ["unverified"]
+    assert records[0]["llm"]["flag"] is None
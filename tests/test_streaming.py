@@ -0,0 +1,94 @@
+import io
+import json
+
+import pytest
+
+import streaming
+from streaming import iter_aligned, iter_array_items, iter_paragraphs, to_jsonl
+
+
+def read(text, chunk_size=4):
+    return list(iter_array_items(io.StringIO(text), chunk_size=chunk_size))
+
+
+def test_items_across_chunks():
+    items = [{"file": "a.docx", "para": [{"para": "EUR 1 000", "para_number": 1}]}, 123, "x", []]
+    text = json.dumps(items, indent=1)
+    assert read(text) == items
+    assert read(text, chunk_size=1 << 20) == items
+    assert read("[]") == []
+    assert read(" [ 1 ,2 ] \n") == [1, 2]
+
+
+@pytest.mark.parametrize("text", ["", "[", "[1, 2", "[123", "[1, 2,", '[{"file": "a"', "[1, 2\n"])
+def test_truncated_input_raises(text):
+    with pytest.raises(json.JSONDecodeError):
+        read(text)
+
+
+def para(text):
+    return {"para": text, "para_number": 1}
+
+
+def write_langs(tmp_path, docs):
+    # docs = {lang: [(file, [texts])]} -> {lang: path} of parsed .json files
+    paths = {}
+    for lang, lang_docs in docs.items():
+        paths[lang] = tmp_path / f"{lang}.json"
+        paths[lang].write_text(json.dumps([{"file": file, "para": [para(t) for t in texts]}
+                                           for file, texts in lang_docs]), encoding="utf-8")
+    return paths
+
+
+@pytest.fixture(params=["ijson", "array"])
+def reader(request, monkeypatch):
+    # Both .json readers: ijson when installed, iter_array_items without it
+    if request.param == "ijson":
+        pytest.importorskip("ijson")
+    else:
+        monkeypatch.setattr(streaming, "ijson", None)
+    return request.param
+
+
+def rows(paths):
+    return [(name, par_num, {lang: p["para"] for lang, p in row.items()})
+            for name, par_num, row in iter_aligned(paths)]
+
+
+def test_empty_document_keeps_the_pairing(tmp_path, reader):
+    paths = write_langs(tmp_path, {
+        "en": [("a", ["a1"]), ("b", []), ("c", ["c1"])],
+        "de": [("a", ["a1 de"]), ("b", ["b1 de"]), ("c", ["c1 de"])],
+    })
+    assert rows(paths) == [
+        ("a", 0, {"en": "a1", "de": "a1 de"}),
+        ("c", 0, {"en": "c1", "de": "c1 de"}),
+    ]
+
+
+def test_duplicate_and_missing_names_stay_apart(tmp_path, reader):
+    paths = write_langs(tmp_path, {
+        "en": [("a", ["a1", "a2"]), ("a", ["b1"]), (None, ["c1"]), (None, ["d1"])],
+        "de": [("x", ["a1 de"]), ("y", ["b1 de", "b2 de"]), ("z", ["c1 de"]), (None, ["d1 de"])],
+    })
+    assert rows(paths) == [
+        ("a", 0, {"en": "a1", "de": "a1 de"}),
+        ("a", 0, {"en": "b1", "de": "b1 de"}),
+        (None, 0, {"en": "c1", "de": "c1 de"}),
+        (None, 0, {"en": "d1", "de": "d1 de"}),
+    ]
+
+
+def test_file_after_para(tmp_path, reader):
+    path = tmp_path / "en.json"
+    path.write_text(json.dumps([{"para": [para("a1"), para("a2")], "file": "a"}, {"para": [para("b1")]}]),
+                    encoding="utf-8")
+    assert [(doc_num, file, p["para"]) for doc_num, file, p in iter_paragraphs(path)] == [
+        (0, "a", "a1"), (0, "a", "a2"), (1, None, "b1"),
+    ]
+
+
+def test_jsonl_keeps_document_numbers(tmp_path, reader):
+    paths = write_langs(tmp_path, {"en": [("a", ["a1"]), ("b", []), ("a", ["c1"])]})
+    to_jsonl(paths["en"], tmp_path / "en.jsonl")
+    assert [(doc_num, file) for doc_num, file, _ in iter_paragraphs(tmp_path / "en.jsonl")] == [(0, "a"), (2, "a")]